@@ -8,37 +8,33 @@ Creates conditional required field rules:
 - Approval Comments Required (State = Rejected)
 """
 
+from __future__ import annotations
+
 import argparse
+import getpass
+import json
 import os
 import sys
-from typing import Optional
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
-from elm_client import ELMClient
+if TYPE_CHECKING:
+    from elm_client import ELMClient
 
-# Business rule definitions
-BUSINESS_RULES = [
-    {
-        "name": "ELM Zone Rationale Required",
-        "description": "Require Zone Rationale when Zone is 2 or 3",
-        "entity": "fsi_environmentrequest",
-        "xaml": """<RuleDefinitions xmlns="http://schemas.microsoft.com/crm/2009/WebServices">
+# Business rule XAML. Rules share one template and differ only in the target
+# attribute and trigger condition; XAML is rendered once at import.
+_RULE_TEMPLATE = """<RuleDefinitions xmlns="http://schemas.microsoft.com/crm/2009/WebServices">
   <Steps>
-    <Step Name="Zone Rationale Required" Description="Set Zone Rationale as required when Zone is 2 or 3">
+    <Step Name="{step}" Description="Set {label} as required when {when}">
       <Condition>
-        <Or>
-          <Condition EntityName="fsi_environmentrequest" AttributeName="fsi_zone" Operator="Equals">
-            <Value>2</Value>
-          </Condition>
-          <Condition EntityName="fsi_environmentrequest" AttributeName="fsi_zone" Operator="Equals">
-            <Value>3</Value>
-          </Condition>
-        </Or>
+{condition}
       </Condition>
       <TrueStep>
         <Action Name="Set Required Level">
           <Arguments>
-            <Argument Name="EntityName">fsi_environmentrequest</Argument>
-            <Argument Name="AttributeName">fsi_zonerationale</Argument>
+            <Argument Name="EntityName">{entity}</Argument>
+            <Argument Name="AttributeName">{attr}</Argument>
             <Argument Name="RequiredLevel">Required</Argument>
           </Arguments>
         </Action>
@@ -46,94 +42,103 @@ BUSINESS_RULES = [
       <FalseStep>
         <Action Name="Set Required Level">
           <Arguments>
-            <Argument Name="EntityName">fsi_environmentrequest</Argument>
-            <Argument Name="AttributeName">fsi_zonerationale</Argument>
+            <Argument Name="EntityName">{entity}</Argument>
+            <Argument Name="AttributeName">{attr}</Argument>
             <Argument Name="RequiredLevel">None</Argument>
           </Arguments>
         </Action>
       </FalseStep>
     </Step>
   </Steps>
-</RuleDefinitions>""",
-    },
-    {
-        "name": "ELM Security Group Required",
-        "description": "Require Security Group ID when Zone is 2 or 3",
-        "entity": "fsi_environmentrequest",
-        "xaml": """<RuleDefinitions xmlns="http://schemas.microsoft.com/crm/2009/WebServices">
-  <Steps>
-    <Step Name="Security Group Required" Description="Set Security Group ID as required when Zone is 2 or 3">
-      <Condition>
-        <Or>
-          <Condition EntityName="fsi_environmentrequest" AttributeName="fsi_zone" Operator="Equals">
+</RuleDefinitions>"""
+
+# Zone is 2 or 3 (shared by the zone-triggered rules)
+_ZONE_23_CONDITION = """        <Or>
+          <Condition EntityName="{entity}" AttributeName="fsi_zone" Operator="Equals">
             <Value>2</Value>
           </Condition>
-          <Condition EntityName="fsi_environmentrequest" AttributeName="fsi_zone" Operator="Equals">
+          <Condition EntityName="{entity}" AttributeName="fsi_zone" Operator="Equals">
             <Value>3</Value>
           </Condition>
-        </Or>
-      </Condition>
-      <TrueStep>
-        <Action Name="Set Required Level">
-          <Arguments>
-            <Argument Name="EntityName">fsi_environmentrequest</Argument>
-            <Argument Name="AttributeName">fsi_securitygroupid</Argument>
-            <Argument Name="RequiredLevel">Required</Argument>
-          </Arguments>
-        </Action>
-      </TrueStep>
-      <FalseStep>
-        <Action Name="Set Required Level">
-          <Arguments>
-            <Argument Name="EntityName">fsi_environmentrequest</Argument>
-            <Argument Name="AttributeName">fsi_securitygroupid</Argument>
-            <Argument Name="RequiredLevel">None</Argument>
-          </Arguments>
-        </Action>
-      </FalseStep>
-    </Step>
-  </Steps>
-</RuleDefinitions>""",
-    },
-    {
-        "name": "ELM Approval Comments Required",
-        "description": "Require Approval Comments when State is Rejected",
-        "entity": "fsi_environmentrequest",
-        "xaml": """<RuleDefinitions xmlns="http://schemas.microsoft.com/crm/2009/WebServices">
-  <Steps>
-    <Step Name="Approval Comments Required" Description="Set Approval Comments as required when State is Rejected">
-      <Condition>
-        <Condition EntityName="fsi_environmentrequest" AttributeName="fsi_state" Operator="Equals">
+        </Or>"""
+
+# State is Rejected (5)
+_STATE_REJECTED_CONDITION = """        <Condition EntityName="{entity}" AttributeName="fsi_state" Operator="Equals">
           <Value>5</Value>
-        </Condition>
-      </Condition>
-      <TrueStep>
-        <Action Name="Set Required Level">
-          <Arguments>
-            <Argument Name="EntityName">fsi_environmentrequest</Argument>
-            <Argument Name="AttributeName">fsi_approvalcomments</Argument>
-            <Argument Name="RequiredLevel">Required</Argument>
-          </Arguments>
-        </Action>
-      </TrueStep>
-      <FalseStep>
-        <Action Name="Set Required Level">
-          <Arguments>
-            <Argument Name="EntityName">fsi_environmentrequest</Argument>
-            <Argument Name="AttributeName">fsi_approvalcomments</Argument>
-            <Argument Name="RequiredLevel">None</Argument>
-          </Arguments>
-        </Action>
-      </FalseStep>
-    </Step>
-  </Steps>
-</RuleDefinitions>""",
-    },
-]
+        </Condition>"""
+
+# trigger -> (condition fragment, description text)
+_TRIGGERS = {
+    "zone_2_or_3": (_ZONE_23_CONDITION, "Zone is 2 or 3"),
+    "state_rejected": (_STATE_REJECTED_CONDITION, "State is Rejected"),
+}
+
+# Business rule definitions (name, target attribute and trigger per rule)
+BUSINESS_RULES_FILE = Path(__file__).with_name("business_rules.json")
 
 
-def create_business_rules(client: ELMClient, dry_run: bool = False) -> None:
-    """Create business rules for ELM entities."""
+@lru_cache(maxsize=None)
+def _render_rule_xaml(trigger: str, entity: str, step: str, label: str, attr: str) -> str:
+    """Render business rule XAML for a trigger condition."""
+    condition, when = _TRIGGERS[trigger]
+    return _RULE_TEMPLATE.format(
+        step=step,
+        label=label,
+        when=when,
+        condition=condition.format(entity=entity),
+        entity=entity,
+        attr=attr,
+    )
+
+
+def _workflow_payload(rule: dict) -> bytes:
+    """Serialize the workflow create request for a business rule."""
+    return json.dumps({
+        "name": rule["name"],
+        "description": rule["description"],
+        "primaryentity": rule["entity"],
+        "category": 2,  # Business Rule
+        "type": 1,  # Definition
+        "scope": 4,  # Entity (entire table)
+        "mode": 0,  # Background
+        "statecode": 1,  # Activated
+        "statuscode": 2,  # Activated
+        "xaml": rule["xaml"],
+    }, separators=(",", ":")).encode("utf-8")
+
+
+@lru_cache(maxsize=None)
+def _load_rules() -> list[dict]:
+    """
+    Load business rule definitions and render their XAML and request bodies.
+
+    Definitions are read on first use rather than at import, so --help and
+    argument errors skip the work. Subsequent calls reuse the result.
+
+    Returns:
+        Rule definitions with "xaml" and "payload" (JSON bytes) added
+    """
+    rules = json.loads(BUSINESS_RULES_FILE.read_bytes())
+    for rule in rules:
+        rule["xaml"] = _render_rule_xaml(
+            rule["trigger"], rule["entity"], rule["step"], rule["label"], rule["attr"]
+        )
+        rule["payload"] = _workflow_payload(rule)
+    return rules
+
+
+def _emit(*lines: str) -> None:
+    """Write one rule's output block in a single stdout write."""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+def create_business_rules(client: Optional[ELMClient], dry_run: bool = False) -> None:
+    """
+    Create business rules for ELM entities.
+
+    A dry run makes no Dataverse calls (client may be None) and lists every
+    rule as one that would be created.
+    """
     print("\n" + "=" * 60)
     print("ELM Business Rules Deployment")
     print("=" * 60)
@@ -143,48 +148,56 @@ def create_business_rules(client: ELMClient, dry_run: bool = False) -> None:
 
     print("\n[Creating Business Rules]")
 
-    for rule in BUSINESS_RULES:
+    rules = _load_rules()
+
+    # Fetch existing business rules once per entity instead of once per rule
+    existing_names: dict[str, set[str]] = {rule["entity"]: set() for rule in rules}
+    if not dry_run:
+        for entity in existing_names:
+            existing_names[entity] = {
+                w.get("name") for w in client.get_workflows(entity, category=2)
+            }
+
+    to_create = []
+    for rule in rules:
         rule_name = rule["name"]
         entity = rule["entity"]
 
-        # Check if rule already exists
-        existing = client.get_workflows(entity, category=2)
-        rule_exists = any(w.get("name") == rule_name for w in existing)
-
-        if rule_exists:
-            print(f"\n  {rule_name}:")
-            print(f"    Already exists, skipping")
+        if rule_name in existing_names[entity]:
+            _emit(f"\n  {rule_name}:", "    Already exists, skipping")
             continue
 
         if dry_run:
-            print(f"\n  {rule_name}:")
-            print(f"    Would create: {rule['description']}")
-            print(f"    Entity: {entity}")
+            _emit(
+                f"\n  {rule_name}:",
+                f"    Would create: {rule['description']}",
+                f"    Entity: {entity}",
+            )
             continue
 
-        # Create the business rule as a workflow
-        workflow_data = {
-            "name": rule_name,
-            "description": rule["description"],
-            "primaryentity": entity,
-            "category": 2,  # Business Rule
-            "type": 1,  # Definition
-            "scope": 4,  # Entity (entire table)
-            "mode": 0,  # Background
-            "statecode": 1,  # Activated
-            "statuscode": 2,  # Activated
-            "xaml": rule["xaml"],
-        }
-
-        try:
-            workflow_id = client.create_workflow(workflow_data)
-            print(f"\n  {rule_name}:")
-            print(f"    Created: {workflow_id}")
-            print(f"    Entity: {entity}")
-        except Exception as e:
-            print(f"\n  {rule_name}:")
-            print(f"    ERROR: {e}")
-            print(f"    NOTE: Business rules may need to be created manually via maker portal")
+        to_create.append(rule)
+
+    # Create all missing business rules as workflows in a single $batch request
+    if to_create:
+        from elm_client import batch_entity_id, batch_error
+
+        operations = [("POST", "workflows", rule["payload"]) for rule in to_create]
+
+        results = client.batch(operations)
+
+        for rule, result in zip(to_create, results):
+            if 200 <= result["status"] < 300:
+                _emit(
+                    f"\n  {rule['name']}:",
+                    f"    Created: {batch_entity_id(result)}",
+                    f"    Entity: {rule['entity']}",
+                )
+            else:
+                _emit(
+                    f"\n  {rule['name']}:",
+                    f"    ERROR: {batch_error(result)}",
+                    "    NOTE: Business rules may need to be created manually via maker portal",
+                )
 
     print("\n" + "=" * 60)
     if dry_run:
@@ -199,6 +212,13 @@ def create_business_rules(client: ELMClient, dry_run: bool = False) -> None:
     print("  - Test with Zone 2/3 requests to confirm conditional requirements")
 
 
+def _elm_client_cls() -> type[ELMClient]:
+    """Import ELMClient on demand so --help and argument errors skip requests/msal."""
+    from elm_client import ELMClient
+
+    return ELMClient
+
+
 def main():
     """CLI entry point."""
     parser = argparse.ArgumentParser(
@@ -239,27 +259,32 @@ def main():
 
     args = parser.parse_args()
 
+    # Dry run is purely local: no connection, credentials or auth needed
+    if args.dry_run:
+        create_business_rules(None, dry_run=True)
+        return
+
     # Validate required arguments
     if not args.tenant_id or not args.environment_url:
         parser.error("--tenant-id and --environment-url are required")
 
+    ELMClient = _elm_client_cls()
+
     # Get client secret if needed
     client_secret = args.client_secret
     if not args.interactive and not client_secret:
         if args.client_id:
-            import getpass
             client_secret = getpass.getpass("Client secret: ")
 
     try:
-        client = ELMClient(
+        with ELMClient(
             tenant_id=args.tenant_id,
             environment_url=args.environment_url,
             client_id=args.client_id,
             client_secret=client_secret,
             interactive=args.interactive,
-        )
-
-        create_business_rules(client, dry_run=args.dry_run)
+        ) as client:
+            create_business_rules(client, dry_run=args.dry_run)
 
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
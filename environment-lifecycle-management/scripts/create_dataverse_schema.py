@@ -6,156 +6,139 @@ Creates EnvironmentRequest and ProvisioningLog tables with all columns,
 choice fields, and relationships.
 """
 
+from __future__ import annotations
+
 import argparse
+import getpass
+import hashlib
+import json
 import os
 import sys
-from typing import Optional
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
-from elm_client import ELMClient
+if TYPE_CHECKING:
+    from elm_client import ELMClient
 
 # Publisher prefix for custom entities
 PUBLISHER_PREFIX = "fsi"
 
+
+@lru_cache(maxsize=None)
+def _label(text: str, lang: int = 1033) -> dict:
+    """Build a Dataverse Label with a single localized label.
+
+    Cached so repeated label text shares one dict tree. Definitions are
+    serialized read-only, so callers must not mutate the result.
+    """
+    return {"LocalizedLabels": [{"Label": text, "LanguageCode": lang}]}
+
+
 # ============================================================================
 # Choice (OptionSet) Definitions
 # ============================================================================
 
-OPTIONSETS = {
-    "fsi_er_state": {
-        "Name": "fsi_er_state",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Request State", "LanguageCode": 1033}]},
-        "Description": {"LocalizedLabels": [{"Label": "Workflow state for environment requests", "LanguageCode": 1033}]},
-        "OptionSetType": "Picklist",
-        "IsGlobal": True,
-        "Options": [
-            {"Value": 1, "Label": {"LocalizedLabels": [{"Label": "Draft", "LanguageCode": 1033}]}},
-            {"Value": 2, "Label": {"LocalizedLabels": [{"Label": "Submitted", "LanguageCode": 1033}]}},
-            {"Value": 3, "Label": {"LocalizedLabels": [{"Label": "PendingApproval", "LanguageCode": 1033}]}},
-            {"Value": 4, "Label": {"LocalizedLabels": [{"Label": "Approved", "LanguageCode": 1033}]}},
-            {"Value": 5, "Label": {"LocalizedLabels": [{"Label": "Rejected", "LanguageCode": 1033}]}},
-            {"Value": 6, "Label": {"LocalizedLabels": [{"Label": "Provisioning", "LanguageCode": 1033}]}},
-            {"Value": 7, "Label": {"LocalizedLabels": [{"Label": "Completed", "LanguageCode": 1033}]}},
-            {"Value": 8, "Label": {"LocalizedLabels": [{"Label": "Failed", "LanguageCode": 1033}]}},
-        ],
-    },
-    "fsi_er_zone": {
-        "Name": "fsi_er_zone",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Governance Zone", "LanguageCode": 1033}]},
-        "Description": {"LocalizedLabels": [{"Label": "Environment governance zone classification", "LanguageCode": 1033}]},
-        "OptionSetType": "Picklist",
-        "IsGlobal": True,
-        "Options": [
-            {"Value": 1, "Label": {"LocalizedLabels": [{"Label": "Zone 1", "LanguageCode": 1033}]}},
-            {"Value": 2, "Label": {"LocalizedLabels": [{"Label": "Zone 2", "LanguageCode": 1033}]}},
-            {"Value": 3, "Label": {"LocalizedLabels": [{"Label": "Zone 3", "LanguageCode": 1033}]}},
-        ],
-    },
-    "fsi_er_environmenttype": {
-        "Name": "fsi_er_environmenttype",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Environment Type", "LanguageCode": 1033}]},
-        "Description": {"LocalizedLabels": [{"Label": "Power Platform environment type", "LanguageCode": 1033}]},
-        "OptionSetType": "Picklist",
-        "IsGlobal": True,
-        "Options": [
-            {"Value": 1, "Label": {"LocalizedLabels": [{"Label": "Sandbox", "LanguageCode": 1033}]}},
-            {"Value": 2, "Label": {"LocalizedLabels": [{"Label": "Production", "LanguageCode": 1033}]}},
-            {"Value": 3, "Label": {"LocalizedLabels": [{"Label": "Developer", "LanguageCode": 1033}]}},
-        ],
-    },
-    "fsi_er_region": {
-        "Name": "fsi_er_region",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Region", "LanguageCode": 1033}]},
-        "Description": {"LocalizedLabels": [{"Label": "Geographic region for environment", "LanguageCode": 1033}]},
-        "OptionSetType": "Picklist",
-        "IsGlobal": True,
-        "Options": [
-            {"Value": 1, "Label": {"LocalizedLabels": [{"Label": "United States", "LanguageCode": 1033}]}},
-            {"Value": 2, "Label": {"LocalizedLabels": [{"Label": "Europe", "LanguageCode": 1033}]}},
-            {"Value": 3, "Label": {"LocalizedLabels": [{"Label": "United Kingdom", "LanguageCode": 1033}]}},
-            {"Value": 4, "Label": {"LocalizedLabels": [{"Label": "Australia", "LanguageCode": 1033}]}},
-        ],
-    },
-    "fsi_er_datasensitivity": {
-        "Name": "fsi_er_datasensitivity",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Data Sensitivity", "LanguageCode": 1033}]},
-        "Description": {"LocalizedLabels": [{"Label": "Data sensitivity classification", "LanguageCode": 1033}]},
-        "OptionSetType": "Picklist",
-        "IsGlobal": True,
-        "Options": [
-            {"Value": 1, "Label": {"LocalizedLabels": [{"Label": "Public", "LanguageCode": 1033}]}},
-            {"Value": 2, "Label": {"LocalizedLabels": [{"Label": "Internal", "LanguageCode": 1033}]}},
-            {"Value": 3, "Label": {"LocalizedLabels": [{"Label": "Confidential", "LanguageCode": 1033}]}},
-            {"Value": 4, "Label": {"LocalizedLabels": [{"Label": "Restricted", "LanguageCode": 1033}]}},
-        ],
-    },
-    "fsi_er_expectedusers": {
-        "Name": "fsi_er_expectedusers",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Expected Users", "LanguageCode": 1033}]},
-        "Description": {"LocalizedLabels": [{"Label": "Expected user population", "LanguageCode": 1033}]},
-        "OptionSetType": "Picklist",
-        "IsGlobal": True,
-        "Options": [
-            {"Value": 1, "Label": {"LocalizedLabels": [{"Label": "Just me (1)", "LanguageCode": 1033}]}},
-            {"Value": 2, "Label": {"LocalizedLabels": [{"Label": "Small team (2-10)", "LanguageCode": 1033}]}},
-            {"Value": 3, "Label": {"LocalizedLabels": [{"Label": "Large team (11-50)", "LanguageCode": 1033}]}},
-            {"Value": 4, "Label": {"LocalizedLabels": [{"Label": "Department (50+)", "LanguageCode": 1033}]}},
-        ],
-    },
-    "fsi_pl_action": {
-        "Name": "fsi_pl_action",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Provisioning Action", "LanguageCode": 1033}]},
-        "Description": {"LocalizedLabels": [{"Label": "Provisioning log action type", "LanguageCode": 1033}]},
-        "OptionSetType": "Picklist",
-        "IsGlobal": True,
-        "Options": [
-            {"Value": 1, "Label": {"LocalizedLabels": [{"Label": "RequestCreated", "LanguageCode": 1033}]}},
-            {"Value": 2, "Label": {"LocalizedLabels": [{"Label": "ZoneClassified", "LanguageCode": 1033}]}},
-            {"Value": 3, "Label": {"LocalizedLabels": [{"Label": "ApprovalRequested", "LanguageCode": 1033}]}},
-            {"Value": 4, "Label": {"LocalizedLabels": [{"Label": "Approved", "LanguageCode": 1033}]}},
-            {"Value": 5, "Label": {"LocalizedLabels": [{"Label": "Rejected", "LanguageCode": 1033}]}},
-            {"Value": 6, "Label": {"LocalizedLabels": [{"Label": "ProvisioningStarted", "LanguageCode": 1033}]}},
-            {"Value": 7, "Label": {"LocalizedLabels": [{"Label": "EnvironmentCreated", "LanguageCode": 1033}]}},
-            {"Value": 8, "Label": {"LocalizedLabels": [{"Label": "ManagedEnabled", "LanguageCode": 1033}]}},
-            {"Value": 9, "Label": {"LocalizedLabels": [{"Label": "GroupAssigned", "LanguageCode": 1033}]}},
-            {"Value": 10, "Label": {"LocalizedLabels": [{"Label": "SecurityGroupBound", "LanguageCode": 1033}]}},
-            {"Value": 11, "Label": {"LocalizedLabels": [{"Label": "BaselineConfigApplied", "LanguageCode": 1033}]}},
-            {"Value": 12, "Label": {"LocalizedLabels": [{"Label": "DLPAssigned", "LanguageCode": 1033}]}},
-            {"Value": 13, "Label": {"LocalizedLabels": [{"Label": "ProvisioningCompleted", "LanguageCode": 1033}]}},
-            {"Value": 14, "Label": {"LocalizedLabels": [{"Label": "ProvisioningFailed", "LanguageCode": 1033}]}},
-            {"Value": 15, "Label": {"LocalizedLabels": [{"Label": "RollbackInitiated", "LanguageCode": 1033}]}},
-            {"Value": 16, "Label": {"LocalizedLabels": [{"Label": "RollbackCompleted", "LanguageCode": 1033}]}},
-        ],
-    },
-    "fsi_pl_actortype": {
-        "Name": "fsi_pl_actortype",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Actor Type", "LanguageCode": 1033}]},
-        "Description": {"LocalizedLabels": [{"Label": "Type of actor performing the action", "LanguageCode": 1033}]},
-        "OptionSetType": "Picklist",
-        "IsGlobal": True,
-        "Options": [
-            {"Value": 1, "Label": {"LocalizedLabels": [{"Label": "User", "LanguageCode": 1033}]}},
-            {"Value": 2, "Label": {"LocalizedLabels": [{"Label": "ServicePrincipal", "LanguageCode": 1033}]}},
-            {"Value": 3, "Label": {"LocalizedLabels": [{"Label": "System", "LanguageCode": 1033}]}},
-        ],
-    },
-}
-
-
-def create_optionsets(client: ELMClient, dry_run: bool = False) -> None:
-    """Create all global option sets."""
+def _option(value: int, label: str) -> dict:
+    """Build an option set option with a localized label."""
+    return {"Value": value, "Label": _label(label)}
+
+
+# Global option set definitions (display name, description and option labels
+# in value order, starting at 1)
+OPTIONSETS_FILE = Path(__file__).with_name("optionsets.json")
+
+
+@lru_cache(maxsize=None)
+def _load_optionsets() -> dict[str, dict]:
+    """
+    Load global option set definitions.
+
+    Read on first use rather than at import, so --help and argument errors
+    skip the work. Subsequent calls reuse the result.
+
+    Returns:
+        Option set metadata keyed by name, per Dataverse Web API spec
+    """
+    optionsets = {}
+    for name, spec in json.loads(OPTIONSETS_FILE.read_bytes()).items():
+        optionsets[name] = {
+            "Name": name,
+            "DisplayName": _label(spec["DisplayName"]),
+            "Description": _label(spec["Description"]),
+            "OptionSetType": "Picklist",
+            "IsGlobal": True,
+            "Options": [_option(v, l) for v, l in enumerate(spec["Options"], start=1)],
+        }
+    return optionsets
+
+
+def create_optionsets(
+    client: Optional[ELMClient],
+    dry_run: bool = False,
+    sequential: bool = False,
+    assume_missing: bool = False,
+) -> None:
+    """
+    Create all global option sets.
+
+    Existence is checked and missing option sets are created with one
+    $batch request each, unless sequential is set.
+
+    Args:
+        client: Authenticated ELM client
+        dry_run: Report what would be created without making changes
+        sequential: Issue requests one at a time (useful for debugging)
+        assume_missing: Skip existence checks in a dry run (client may be None)
+    """
     print("\n[Creating Global Option Sets]")
 
-    for name, definition in OPTIONSETS.items():
-        existing = client.get_global_optionset(name)
-        if existing:
-            print(f"  {name}: already exists, skipping")
-            continue
+    optionsets = _load_optionsets()
+    names = list(optionsets)
+    if assume_missing:
+        for name in names:
+            print(f"  {name}: would create (unchecked)")
+        return
+    if sequential:
+        existing = [client.get_global_optionset(name) for name in names]
+    else:
+        found = client.get_global_optionsets(names)
+        existing = [found[name] for name in names]
 
-        if dry_run:
+    to_create = []
+    for name, found in zip(names, existing):
+        if found:
+            print(f"  {name}: already exists, skipping")
+        elif dry_run:
             print(f"  {name}: would create")
         else:
+            to_create.append(name)
+
+    if not to_create:
+        return
+
+    definitions = [optionsets[name] for name in to_create]
+    if sequential:
+        for definition in definitions:
             client.create_global_optionset(definition)
+            print(f"  {definition['Name']}: created")
+        return
+
+    # Create all missing option sets in one $batch request
+    from elm_client import batch_error
+
+    failed = []
+    for name, result in zip(to_create, client.batch_create_global_optionsets(definitions)):
+        if 200 <= result["status"] < 300:
             print(f"  {name}: created")
+        elif result["status"] == 409:
+            print(f"  {name}: already exists")
+        else:
+            print(f"  {name}: ERROR: {batch_error(result)}")
+            failed.append(name)
+
+    if failed:
+        raise RuntimeError(f"Failed to create option sets: {', '.join(failed)}")
 
 
 # ============================================================================
@@ -167,9 +150,9 @@ def get_environment_request_entity() -> dict:
     return {
         "@odata.type": "Microsoft.Dynamics.CRM.EntityMetadata",
         "SchemaName": "fsi_EnvironmentRequest",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Environment Request", "LanguageCode": 1033}]},
-        "DisplayCollectionName": {"LocalizedLabels": [{"Label": "Environment Requests", "LanguageCode": 1033}]},
-        "Description": {"LocalizedLabels": [{"Label": "Environment provisioning requests with zone classification", "LanguageCode": 1033}]},
+        "DisplayName": _label("Environment Request"),
+        "DisplayCollectionName": _label("Environment Requests"),
+        "Description": _label("Environment provisioning requests with zone classification"),
         "OwnershipType": "UserOwned",
         "IsActivity": False,
         "HasActivities": False,
@@ -180,8 +163,8 @@ def get_environment_request_entity() -> dict:
             {
                 "@odata.type": "Microsoft.Dynamics.CRM.StringAttributeMetadata",
                 "SchemaName": "fsi_RequestNumber",
-                "DisplayName": {"LocalizedLabels": [{"Label": "Request Number", "LanguageCode": 1033}]},
-                "Description": {"LocalizedLabels": [{"Label": "Auto-generated request number (REQ-00001)", "LanguageCode": 1033}]},
+                "DisplayName": _label("Request Number"),
+                "Description": _label("Auto-generated request number (REQ-00001)"),
                 "RequiredLevel": {"Value": "ApplicationRequired"},
                 "MaxLength": 20,
                 "FormatName": {"Value": "Text"},
@@ -196,9 +179,9 @@ def get_provisioning_log_entity() -> dict:
     return {
         "@odata.type": "Microsoft.Dynamics.CRM.EntityMetadata",
         "SchemaName": "fsi_ProvisioningLog",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Provisioning Log", "LanguageCode": 1033}]},
-        "DisplayCollectionName": {"LocalizedLabels": [{"Label": "Provisioning Logs", "LanguageCode": 1033}]},
-        "Description": {"LocalizedLabels": [{"Label": "Immutable audit trail for environment provisioning", "LanguageCode": 1033}]},
+        "DisplayName": _label("Provisioning Log"),
+        "DisplayCollectionName": _label("Provisioning Logs"),
+        "Description": _label("Immutable audit trail for environment provisioning"),
         "OwnershipType": "OrganizationOwned",  # Critical for immutability
         "IsActivity": False,
         "HasActivities": False,
@@ -209,7 +192,7 @@ def get_provisioning_log_entity() -> dict:
             {
                 "@odata.type": "Microsoft.Dynamics.CRM.StringAttributeMetadata",
                 "SchemaName": "fsi_Name",
-                "DisplayName": {"LocalizedLabels": [{"Label": "Log ID", "LanguageCode": 1033}]},
+                "DisplayName": _label("Log ID"),
                 "RequiredLevel": {"Value": "ApplicationRequired"},
                 "MaxLength": 100,
                 "FormatName": {"Value": "Text"},
@@ -227,8 +210,8 @@ ENVIRONMENT_REQUEST_COLUMNS = [
     {
         "@odata.type": "Microsoft.Dynamics.CRM.StringAttributeMetadata",
         "SchemaName": "fsi_EnvironmentName",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Environment Name", "LanguageCode": 1033}]},
-        "Description": {"LocalizedLabels": [{"Label": "DEPT-Purpose-TYPE naming convention", "LanguageCode": 1033}]},
+        "DisplayName": _label("Environment Name"),
+        "Description": _label("DEPT-Purpose-TYPE naming convention"),
         "RequiredLevel": {"Value": "ApplicationRequired"},
         "MaxLength": 100,
         "FormatName": {"Value": "Text"},
@@ -236,21 +219,21 @@ ENVIRONMENT_REQUEST_COLUMNS = [
     {
         "@odata.type": "Microsoft.Dynamics.CRM.PicklistAttributeMetadata",
         "SchemaName": "fsi_EnvironmentType",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Environment Type", "LanguageCode": 1033}]},
+        "DisplayName": _label("Environment Type"),
         "RequiredLevel": {"Value": "ApplicationRequired"},
         "GlobalOptionSet@odata.bind": "/GlobalOptionSetDefinitions(Name='fsi_er_environmenttype')",
     },
     {
         "@odata.type": "Microsoft.Dynamics.CRM.PicklistAttributeMetadata",
         "SchemaName": "fsi_Region",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Region", "LanguageCode": 1033}]},
+        "DisplayName": _label("Region"),
         "RequiredLevel": {"Value": "ApplicationRequired"},
         "GlobalOptionSet@odata.bind": "/GlobalOptionSetDefinitions(Name='fsi_er_region')",
     },
     {
         "@odata.type": "Microsoft.Dynamics.CRM.MemoAttributeMetadata",
         "SchemaName": "fsi_BusinessJustification",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Business Justification", "LanguageCode": 1033}]},
+        "DisplayName": _label("Business Justification"),
         "RequiredLevel": {"Value": "ApplicationRequired"},
         "MaxLength": 4000,
     },
@@ -258,22 +241,22 @@ ENVIRONMENT_REQUEST_COLUMNS = [
     {
         "@odata.type": "Microsoft.Dynamics.CRM.PicklistAttributeMetadata",
         "SchemaName": "fsi_Zone",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Zone", "LanguageCode": 1033}]},
+        "DisplayName": _label("Zone"),
         "RequiredLevel": {"Value": "ApplicationRequired"},
         "GlobalOptionSet@odata.bind": "/GlobalOptionSetDefinitions(Name='fsi_er_zone')",
     },
     {
         "@odata.type": "Microsoft.Dynamics.CRM.MemoAttributeMetadata",
         "SchemaName": "fsi_ZoneRationale",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Zone Rationale", "LanguageCode": 1033}]},
+        "DisplayName": _label("Zone Rationale"),
         "RequiredLevel": {"Value": "None"},  # Required via business rule for Zone 2/3
         "MaxLength": 4000,
     },
     {
         "@odata.type": "Microsoft.Dynamics.CRM.StringAttributeMetadata",
         "SchemaName": "fsi_ZoneAutoFlags",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Zone Auto Flags", "LanguageCode": 1033}]},
-        "Description": {"LocalizedLabels": [{"Label": "Auto-detected zone triggers (comma-separated)", "LanguageCode": 1033}]},
+        "DisplayName": _label("Zone Auto Flags"),
+        "Description": _label("Auto-detected zone triggers (comma-separated)"),
         "RequiredLevel": {"Value": "None"},
         "MaxLength": 500,
         "FormatName": {"Value": "Text"},
@@ -281,14 +264,14 @@ ENVIRONMENT_REQUEST_COLUMNS = [
     {
         "@odata.type": "Microsoft.Dynamics.CRM.PicklistAttributeMetadata",
         "SchemaName": "fsi_DataSensitivity",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Data Sensitivity", "LanguageCode": 1033}]},
+        "DisplayName": _label("Data Sensitivity"),
         "RequiredLevel": {"Value": "ApplicationRequired"},
         "GlobalOptionSet@odata.bind": "/GlobalOptionSetDefinitions(Name='fsi_er_datasensitivity')",
     },
     {
         "@odata.type": "Microsoft.Dynamics.CRM.PicklistAttributeMetadata",
         "SchemaName": "fsi_ExpectedUsers",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Expected Users", "LanguageCode": 1033}]},
+        "DisplayName": _label("Expected Users"),
         "RequiredLevel": {"Value": "ApplicationRequired"},
         "GlobalOptionSet@odata.bind": "/GlobalOptionSetDefinitions(Name='fsi_er_expectedusers')",
     },
@@ -296,8 +279,8 @@ ENVIRONMENT_REQUEST_COLUMNS = [
     {
         "@odata.type": "Microsoft.Dynamics.CRM.StringAttributeMetadata",
         "SchemaName": "fsi_SecurityGroupId",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Security Group ID", "LanguageCode": 1033}]},
-        "Description": {"LocalizedLabels": [{"Label": "Entra security group GUID", "LanguageCode": 1033}]},
+        "DisplayName": _label("Security Group ID"),
+        "Description": _label("Entra security group GUID"),
         "RequiredLevel": {"Value": "None"},  # Required via business rule for Zone 2/3
         "MaxLength": 100,
         "FormatName": {"Value": "Text"},
@@ -305,14 +288,14 @@ ENVIRONMENT_REQUEST_COLUMNS = [
     {
         "@odata.type": "Microsoft.Dynamics.CRM.LookupAttributeMetadata",
         "SchemaName": "fsi_Requester",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Requester", "LanguageCode": 1033}]},
+        "DisplayName": _label("Requester"),
         "RequiredLevel": {"Value": "None"},
         "Targets": ["systemuser"],
     },
     {
         "@odata.type": "Microsoft.Dynamics.CRM.DateTimeAttributeMetadata",
         "SchemaName": "fsi_RequestedOn",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Requested On", "LanguageCode": 1033}]},
+        "DisplayName": _label("Requested On"),
         "RequiredLevel": {"Value": "None"},
         "Format": "DateAndTime",
     },
@@ -320,28 +303,28 @@ ENVIRONMENT_REQUEST_COLUMNS = [
     {
         "@odata.type": "Microsoft.Dynamics.CRM.PicklistAttributeMetadata",
         "SchemaName": "fsi_State",
-        "DisplayName": {"LocalizedLabels": [{"Label": "State", "LanguageCode": 1033}]},
+        "DisplayName": _label("State"),
         "RequiredLevel": {"Value": "None"},
         "GlobalOptionSet@odata.bind": "/GlobalOptionSetDefinitions(Name='fsi_er_state')",
     },
     {
         "@odata.type": "Microsoft.Dynamics.CRM.LookupAttributeMetadata",
         "SchemaName": "fsi_Approver",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Approver", "LanguageCode": 1033}]},
+        "DisplayName": _label("Approver"),
         "RequiredLevel": {"Value": "None"},
         "Targets": ["systemuser"],
     },
     {
         "@odata.type": "Microsoft.Dynamics.CRM.DateTimeAttributeMetadata",
         "SchemaName": "fsi_ApprovedOn",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Approved On", "LanguageCode": 1033}]},
+        "DisplayName": _label("Approved On"),
         "RequiredLevel": {"Value": "None"},
         "Format": "DateAndTime",
     },
     {
         "@odata.type": "Microsoft.Dynamics.CRM.MemoAttributeMetadata",
         "SchemaName": "fsi_ApprovalComments",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Approval Comments", "LanguageCode": 1033}]},
+        "DisplayName": _label("Approval Comments"),
         "RequiredLevel": {"Value": "None"},  # Required via business rule on rejection
         "MaxLength": 4000,
     },
@@ -349,8 +332,8 @@ ENVIRONMENT_REQUEST_COLUMNS = [
     {
         "@odata.type": "Microsoft.Dynamics.CRM.StringAttributeMetadata",
         "SchemaName": "fsi_EnvironmentId",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Environment ID", "LanguageCode": 1033}]},
-        "Description": {"LocalizedLabels": [{"Label": "Power Platform environment GUID", "LanguageCode": 1033}]},
+        "DisplayName": _label("Environment ID"),
+        "Description": _label("Power Platform environment GUID"),
         "RequiredLevel": {"Value": "None"},
         "MaxLength": 100,
         "FormatName": {"Value": "Text"},
@@ -358,7 +341,7 @@ ENVIRONMENT_REQUEST_COLUMNS = [
     {
         "@odata.type": "Microsoft.Dynamics.CRM.StringAttributeMetadata",
         "SchemaName": "fsi_EnvironmentUrl",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Environment URL", "LanguageCode": 1033}]},
+        "DisplayName": _label("Environment URL"),
         "RequiredLevel": {"Value": "None"},
         "MaxLength": 500,
         "FormatName": {"Value": "Url"},
@@ -366,14 +349,14 @@ ENVIRONMENT_REQUEST_COLUMNS = [
     {
         "@odata.type": "Microsoft.Dynamics.CRM.DateTimeAttributeMetadata",
         "SchemaName": "fsi_ProvisioningStarted",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Provisioning Started", "LanguageCode": 1033}]},
+        "DisplayName": _label("Provisioning Started"),
         "RequiredLevel": {"Value": "None"},
         "Format": "DateAndTime",
     },
     {
         "@odata.type": "Microsoft.Dynamics.CRM.DateTimeAttributeMetadata",
         "SchemaName": "fsi_ProvisioningCompleted",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Provisioning Completed", "LanguageCode": 1033}]},
+        "DisplayName": _label("Provisioning Completed"),
         "RequiredLevel": {"Value": "None"},
         "Format": "DateAndTime",
     },
@@ -384,15 +367,15 @@ PROVISIONING_LOG_COLUMNS = [
     {
         "@odata.type": "Microsoft.Dynamics.CRM.LookupAttributeMetadata",
         "SchemaName": "fsi_EnvironmentRequest",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Environment Request", "LanguageCode": 1033}]},
+        "DisplayName": _label("Environment Request"),
         "RequiredLevel": {"Value": "ApplicationRequired"},
         "Targets": ["fsi_environmentrequest"],
     },
     {
         "@odata.type": "Microsoft.Dynamics.CRM.IntegerAttributeMetadata",
         "SchemaName": "fsi_Sequence",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Sequence", "LanguageCode": 1033}]},
-        "Description": {"LocalizedLabels": [{"Label": "Action sequence number (1, 2, 3...)", "LanguageCode": 1033}]},
+        "DisplayName": _label("Sequence"),
+        "Description": _label("Action sequence number (1, 2, 3...)"),
         "RequiredLevel": {"Value": "ApplicationRequired"},
         "MinValue": 1,
         "MaxValue": 999,
@@ -400,23 +383,23 @@ PROVISIONING_LOG_COLUMNS = [
     {
         "@odata.type": "Microsoft.Dynamics.CRM.PicklistAttributeMetadata",
         "SchemaName": "fsi_Action",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Action", "LanguageCode": 1033}]},
+        "DisplayName": _label("Action"),
         "RequiredLevel": {"Value": "ApplicationRequired"},
         "GlobalOptionSet@odata.bind": "/GlobalOptionSetDefinitions(Name='fsi_pl_action')",
     },
     {
         "@odata.type": "Microsoft.Dynamics.CRM.MemoAttributeMetadata",
         "SchemaName": "fsi_ActionDetails",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Action Details", "LanguageCode": 1033}]},
-        "Description": {"LocalizedLabels": [{"Label": "JSON payload with action details", "LanguageCode": 1033}]},
+        "DisplayName": _label("Action Details"),
+        "Description": _label("JSON payload with action details"),
         "RequiredLevel": {"Value": "None"},
         "MaxLength": 10000,
     },
     {
         "@odata.type": "Microsoft.Dynamics.CRM.StringAttributeMetadata",
         "SchemaName": "fsi_Actor",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Actor", "LanguageCode": 1033}]},
-        "Description": {"LocalizedLabels": [{"Label": "UPN or Service Principal ID", "LanguageCode": 1033}]},
+        "DisplayName": _label("Actor"),
+        "Description": _label("UPN or Service Principal ID"),
         "RequiredLevel": {"Value": "ApplicationRequired"},
         "MaxLength": 200,
         "FormatName": {"Value": "Text"},
@@ -424,36 +407,36 @@ PROVISIONING_LOG_COLUMNS = [
     {
         "@odata.type": "Microsoft.Dynamics.CRM.PicklistAttributeMetadata",
         "SchemaName": "fsi_ActorType",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Actor Type", "LanguageCode": 1033}]},
+        "DisplayName": _label("Actor Type"),
         "RequiredLevel": {"Value": "ApplicationRequired"},
         "GlobalOptionSet@odata.bind": "/GlobalOptionSetDefinitions(Name='fsi_pl_actortype')",
     },
     {
         "@odata.type": "Microsoft.Dynamics.CRM.DateTimeAttributeMetadata",
         "SchemaName": "fsi_Timestamp",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Timestamp", "LanguageCode": 1033}]},
+        "DisplayName": _label("Timestamp"),
         "RequiredLevel": {"Value": "ApplicationRequired"},
         "Format": "DateAndTime",
     },
     {
         "@odata.type": "Microsoft.Dynamics.CRM.BooleanAttributeMetadata",
         "SchemaName": "fsi_Success",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Success", "LanguageCode": 1033}]},
+        "DisplayName": _label("Success"),
         "RequiredLevel": {"Value": "ApplicationRequired"},
         "DefaultValue": True,
     },
     {
         "@odata.type": "Microsoft.Dynamics.CRM.MemoAttributeMetadata",
         "SchemaName": "fsi_ErrorMessage",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Error Message", "LanguageCode": 1033}]},
+        "DisplayName": _label("Error Message"),
         "RequiredLevel": {"Value": "None"},
         "MaxLength": 10000,
     },
     {
         "@odata.type": "Microsoft.Dynamics.CRM.StringAttributeMetadata",
         "SchemaName": "fsi_CorrelationId",
-        "DisplayName": {"LocalizedLabels": [{"Label": "Correlation ID", "LanguageCode": 1033}]},
-        "Description": {"LocalizedLabels": [{"Label": "Power Automate run ID", "LanguageCode": 1033}]},
+        "DisplayName": _label("Correlation ID"),
+        "Description": _label("Power Automate run ID"),
         "RequiredLevel": {"Value": "ApplicationRequired"},
         "MaxLength": 100,
         "FormatName": {"Value": "Text"},
@@ -461,66 +444,209 @@ PROVISIONING_LOG_COLUMNS = [
 ]
 
 
-def create_tables(client: ELMClient, dry_run: bool = False) -> None:
-    """Create ELM tables with all columns."""
+def _column_payloads(columns: list[dict]) -> list[tuple[str, bytes]]:
+    """Pair each column's logical name with its pre-serialized (compact) JSON body."""
+    return [
+        (col["SchemaName"].lower(), json.dumps(col, separators=(",", ":")).encode("utf-8"))
+        for col in columns
+    ]
+
+
+# Logical names and request bodies, computed once at import. Kept outside the
+# definitions so the payloads sent to Dataverse are unchanged.
+ENVIRONMENT_REQUEST_COLUMN_PAYLOADS = _column_payloads(ENVIRONMENT_REQUEST_COLUMNS)
+PROVISIONING_LOG_COLUMN_PAYLOADS = _column_payloads(PROVISIONING_LOG_COLUMNS)
+
+
+def create_tables(
+    client: Optional[ELMClient], dry_run: bool = False, assume_missing: bool = False
+) -> None:
+    """
+    Create ELM tables with all columns.
+
+    Args:
+        client: Authenticated ELM client
+        dry_run: Report what would be created without making changes
+        assume_missing: Skip existence checks in a dry run (client may be None)
+    """
     print("\n[Creating Tables]")
+    unchecked = "; unchecked" if assume_missing else ""
 
     # Create EnvironmentRequest table
     er_logical_name = "fsi_environmentrequest"
-    existing = client.get_entity_metadata(er_logical_name)
+    existing = None if assume_missing else client.get_entity_metadata(er_logical_name)
     if existing:
         print(f"  {er_logical_name}: already exists")
     elif dry_run:
-        print(f"  {er_logical_name}: would create (User-owned, auditing enabled)")
+        print(f"  {er_logical_name}: would create (User-owned, auditing enabled{unchecked})")
     else:
         client.create_entity(get_environment_request_entity())
         print(f"  {er_logical_name}: created")
 
     # Create ProvisioningLog table
     pl_logical_name = "fsi_provisioninglog"
-    existing = client.get_entity_metadata(pl_logical_name)
+    existing = None if assume_missing else client.get_entity_metadata(pl_logical_name)
     if existing:
         print(f"  {pl_logical_name}: already exists")
     elif dry_run:
-        print(f"  {pl_logical_name}: would create (Org-owned, auditing enabled)")
+        print(f"  {pl_logical_name}: would create (Org-owned, auditing enabled{unchecked})")
     else:
         client.create_entity(get_provisioning_log_entity())
         print(f"  {pl_logical_name}: created")
 
 
-def create_columns(client: ELMClient, dry_run: bool = False) -> None:
+def _create_table_columns(
+    client: Optional[ELMClient],
+    entity_logical_name: str,
+    columns: list[tuple[str, bytes]],
+    dry_run: bool,
+    assume_missing: bool = False,
+) -> None:
+    """
+    Create missing columns on one table in a single $batch request.
+
+    Args:
+        client: Authenticated ELM client
+        entity_logical_name: Table logical name
+        columns: (logical name, serialized column definition) pairs
+        dry_run: Report what would be created without making changes
+        assume_missing: Skip existence checks in a dry run (client may be None)
+
+    Raises:
+        RuntimeError: If any column could not be created
+    """
+    report: list[str] = []
+    failed: list[str] = []
+
+    if assume_missing:
+        report.extend(f"    {col_name}: would create (unchecked)" for col_name, _ in columns)
+    else:
+        from elm_client import batch_error
+
+        # One request for the table's attribute names instead of a GET per column
+        existing_names = client.list_attribute_logical_names(entity_logical_name)
+
+        to_create = []
+        for col_name, col in columns:
+            if col_name in existing_names:
+                report.append(f"    {col_name}: already exists")
+            elif dry_run:
+                report.append(f"    {col_name}: would create")
+            else:
+                to_create.append((col_name, col))
+
+        if to_create:
+            results = client.batch_create_attributes(
+                entity_logical_name, [col for _, col in to_create]
+            )
+            for (col_name, _), result in zip(to_create, results):
+                if 200 <= result["status"] < 300:
+                    report.append(f"    {col_name}: created")
+                elif result["status"] == 409:
+                    report.append(f"    {col_name}: already exists")
+                else:
+                    report.append(f"    {col_name}: ERROR: {batch_error(result)}")
+                    failed.append(col_name)
+
+    # Emit the table's status lines in one write
+    sys.stdout.write("".join(f"{line}\n" for line in report))
+
+    if failed:
+        raise RuntimeError(
+            f"Failed to create columns on {entity_logical_name}: {', '.join(failed)}"
+        )
+
+
+def create_columns(
+    client: Optional[ELMClient], dry_run: bool = False, assume_missing: bool = False
+) -> None:
     """Create columns on ELM tables."""
     print("\n[Creating Columns]")
 
     # EnvironmentRequest columns
     print("  EnvironmentRequest columns:")
-    for col in ENVIRONMENT_REQUEST_COLUMNS:
-        col_name = col["SchemaName"].lower()
-        existing = client.get_attribute_metadata("fsi_environmentrequest", col_name)
-        if existing:
-            print(f"    {col_name}: already exists")
-        elif dry_run:
-            print(f"    {col_name}: would create")
-        else:
-            client.create_attribute("fsi_environmentrequest", col)
-            print(f"    {col_name}: created")
+    _create_table_columns(
+        client, "fsi_environmentrequest", ENVIRONMENT_REQUEST_COLUMN_PAYLOADS,
+        dry_run, assume_missing,
+    )
 
     # ProvisioningLog columns
     print("  ProvisioningLog columns:")
-    for col in PROVISIONING_LOG_COLUMNS:
-        col_name = col["SchemaName"].lower()
-        existing = client.get_attribute_metadata("fsi_provisioninglog", col_name)
-        if existing:
-            print(f"    {col_name}: already exists")
-        elif dry_run:
-            print(f"    {col_name}: would create")
-        else:
-            client.create_attribute("fsi_provisioninglog", col)
-            print(f"    {col_name}: created")
+    _create_table_columns(
+        client, "fsi_provisioninglog", PROVISIONING_LOG_COLUMN_PAYLOADS,
+        dry_run, assume_missing,
+    )
 
 
-def create_schema(client: ELMClient, dry_run: bool = False) -> None:
-    """Create complete Dataverse schema for ELM."""
+# File under the client's cache directory holding the last deployed schema hash
+SCHEMA_FINGERPRINT_FILE = "schema_fingerprint"
+
+
+def schema_fingerprint() -> str:
+    """Hash every option set, table and column definition deployed by create_schema."""
+    definitions = [
+        _load_optionsets(),
+        get_environment_request_entity(),
+        get_provisioning_log_entity(),
+        ENVIRONMENT_REQUEST_COLUMNS,
+        PROVISIONING_LOG_COLUMNS,
+    ]
+    encoded = json.dumps(definitions, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _read_fingerprint(client: ELMClient) -> Optional[str]:
+    """Return the fingerprint stored by the last successful deploy, if any."""
+    # A client with caching disabled (cache_ttl=0, deploy.py --no-cache)
+    # does not trust local state
+    if not client.cache_enabled:
+        return None
+    try:
+        return (client.cache_dir / SCHEMA_FINGERPRINT_FILE).read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+
+
+def _write_fingerprint(client: ELMClient, fingerprint: str) -> None:
+    """Record the deployed schema fingerprint (best-effort)."""
+    if not client.cache_enabled:
+        return
+    try:
+        client.cache_dir.mkdir(parents=True, exist_ok=True)
+        (client.cache_dir / SCHEMA_FINGERPRINT_FILE).write_text(fingerprint, encoding="utf-8")
+    except OSError:
+        pass
+
+
+def create_schema(
+    client: Optional[ELMClient],
+    dry_run: bool = False,
+    sequential: bool = False,
+    assume_missing: bool = False,
+    force: bool = False,
+) -> None:
+    """
+    Create complete Dataverse schema for ELM.
+
+    After a successful deployment the schema fingerprint is stored locally
+    per environment; later runs with unchanged definitions return early.
+    The fingerprint is ignored when the client's cache is disabled and is
+    removed by client.clear_cache().
+
+    Args:
+        client: Authenticated ELM client (may be None with assume_missing)
+        dry_run: Report what would be created without making changes
+        sequential: Issue option set requests one at a time
+        assume_missing: In a dry run, skip all existence checks and report
+                        every component as missing, without contacting Dataverse
+        force: Deploy even if the schema fingerprint is unchanged
+
+    Raises:
+        ValueError: If assume_missing is set without dry_run
+    """
+    if assume_missing and not dry_run:
+        raise ValueError("assume_missing is only supported for dry runs")
+
     print("=" * 60)
     print("ELM Dataverse Schema Deployment")
     print("=" * 60)
@@ -528,14 +654,25 @@ def create_schema(client: ELMClient, dry_run: bool = False) -> None:
     if dry_run:
         print("\n*** DRY RUN - No changes will be made ***\n")
 
+    fingerprint = None
+    if not dry_run:
+        fingerprint = schema_fingerprint()
+        if not force and _read_fingerprint(client) == fingerprint:
+            print("\nNo schema changes since last deployment, skipping")
+            print("(use --force to redeploy)")
+            return
+
     # Step 1: Create option sets (must exist before tables reference them)
-    create_optionsets(client, dry_run)
+    create_optionsets(client, dry_run, sequential, assume_missing)
 
     # Step 2: Create tables
-    create_tables(client, dry_run)
+    create_tables(client, dry_run, assume_missing)
 
     # Step 3: Create columns
-    create_columns(client, dry_run)
+    create_columns(client, dry_run, assume_missing)
+
+    if fingerprint:
+        _write_fingerprint(client, fingerprint)
 
     print("\n" + "=" * 60)
     if dry_run:
@@ -545,6 +682,13 @@ def create_schema(client: ELMClient, dry_run: bool = False) -> None:
     print("=" * 60)
 
 
+def _elm_client_cls() -> type[ELMClient]:
+    """Import ELMClient on demand so --help and argument errors skip requests/msal."""
+    from elm_client import ELMClient
+
+    return ELMClient
+
+
 def main():
     """CLI entry point."""
     parser = argparse.ArgumentParser(
@@ -582,30 +726,56 @@ def main():
         action="store_true",
         help="Show what would be created without making changes",
     )
+    parser.add_argument(
+        "--sequential",
+        action="store_true",
+        help="Send option set requests one at a time instead of a single $batch",
+    )
+    parser.add_argument(
+        "--assume-missing",
+        action="store_true",
+        help="With --dry-run, skip existence checks and run offline",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Deploy even if the schema is unchanged since the last deployment",
+    )
 
     args = parser.parse_args()
 
+    if args.assume_missing:
+        if not args.dry_run:
+            parser.error("--assume-missing requires --dry-run")
+        create_schema(None, dry_run=True, assume_missing=True)
+        return
+
     # Validate required arguments
     if not args.tenant_id or not args.environment_url:
         parser.error("--tenant-id and --environment-url are required")
 
+    ELMClient = _elm_client_cls()
+
     # Get client secret if needed
     client_secret = args.client_secret
     if not args.interactive and not client_secret:
         if args.client_id:
-            import getpass
             client_secret = getpass.getpass("Client secret: ")
 
     try:
-        client = ELMClient(
+        with ELMClient(
             tenant_id=args.tenant_id,
             environment_url=args.environment_url,
             client_id=args.client_id,
             client_secret=client_secret,
             interactive=args.interactive,
-        )
-
-        create_schema(client, dry_run=args.dry_run)
+        ) as client:
+            create_schema(
+                client,
+                dry_run=args.dry_run,
+                sequential=args.sequential,
+                force=args.force,
+            )
 
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
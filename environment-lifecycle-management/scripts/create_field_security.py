@@ -6,41 +6,51 @@ Creates ELM Approver Fields profile to restrict approvers to only
 modifying approval-related fields.
 """
 
+from __future__ import annotations
+
 import argparse
+import getpass
 import os
 import sys
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from elm_client import ELMClient
 
-from elm_client import ELMClient
+# Seconds a cached profile lookup is reused. Dry runs make no changes, so
+# they tolerate a much staler view.
+PROFILE_CACHE_TTL = 60
+DRY_RUN_PROFILE_CACHE_TTL = 24 * 60 * 60
 
-# Field permissions for ELM Approver Fields profile
+# Field permissions for ELM Approver Fields profile as
+# (attribute, canread, cancreate, canupdate) rows
 # Can Read = 4, Can Update = 2, Can Create = 1
 # Permissions are combined: Read+Update = 6, Read only = 4
-APPROVER_FIELD_PERMISSIONS = {
+APPROVER_FIELD_PERMISSIONS: list[tuple[str, int, int, int]] = [
     # Approval fields - approvers can read and update
-    "fsi_state": {"canread": 4, "cancreate": 0, "canupdate": 2},
-    "fsi_approver": {"canread": 4, "cancreate": 0, "canupdate": 2},
-    "fsi_approvedon": {"canread": 4, "cancreate": 0, "canupdate": 2},
-    "fsi_approvalcomments": {"canread": 4, "cancreate": 0, "canupdate": 2},
+    ("fsi_state", 4, 0, 2),
+    ("fsi_approver", 4, 0, 2),
+    ("fsi_approvedon", 4, 0, 2),
+    ("fsi_approvalcomments", 4, 0, 2),
     # All other fields - read only
-    "fsi_requestnumber": {"canread": 4, "cancreate": 0, "canupdate": 0},
-    "fsi_environmentname": {"canread": 4, "cancreate": 0, "canupdate": 0},
-    "fsi_environmenttype": {"canread": 4, "cancreate": 0, "canupdate": 0},
-    "fsi_region": {"canread": 4, "cancreate": 0, "canupdate": 0},
-    "fsi_businessjustification": {"canread": 4, "cancreate": 0, "canupdate": 0},
-    "fsi_zone": {"canread": 4, "cancreate": 0, "canupdate": 0},
-    "fsi_zonerationale": {"canread": 4, "cancreate": 0, "canupdate": 0},
-    "fsi_zoneautoflags": {"canread": 4, "cancreate": 0, "canupdate": 0},
-    "fsi_datasensitivity": {"canread": 4, "cancreate": 0, "canupdate": 0},
-    "fsi_expectedusers": {"canread": 4, "cancreate": 0, "canupdate": 0},
-    "fsi_securitygroupid": {"canread": 4, "cancreate": 0, "canupdate": 0},
-    "fsi_requester": {"canread": 4, "cancreate": 0, "canupdate": 0},
-    "fsi_requestedon": {"canread": 4, "cancreate": 0, "canupdate": 0},
-    "fsi_environmentid": {"canread": 4, "cancreate": 0, "canupdate": 0},
-    "fsi_environmenturl": {"canread": 4, "cancreate": 0, "canupdate": 0},
-    "fsi_provisioningstarted": {"canread": 4, "cancreate": 0, "canupdate": 0},
-    "fsi_provisioningcompleted": {"canread": 4, "cancreate": 0, "canupdate": 0},
-}
+    ("fsi_requestnumber", 4, 0, 0),
+    ("fsi_environmentname", 4, 0, 0),
+    ("fsi_environmenttype", 4, 0, 0),
+    ("fsi_region", 4, 0, 0),
+    ("fsi_businessjustification", 4, 0, 0),
+    ("fsi_zone", 4, 0, 0),
+    ("fsi_zonerationale", 4, 0, 0),
+    ("fsi_zoneautoflags", 4, 0, 0),
+    ("fsi_datasensitivity", 4, 0, 0),
+    ("fsi_expectedusers", 4, 0, 0),
+    ("fsi_securitygroupid", 4, 0, 0),
+    ("fsi_requester", 4, 0, 0),
+    ("fsi_requestedon", 4, 0, 0),
+    ("fsi_environmentid", 4, 0, 0),
+    ("fsi_environmenturl", 4, 0, 0),
+    ("fsi_provisioningstarted", 4, 0, 0),
+    ("fsi_provisioningcompleted", 4, 0, 0),
+]
 
 
 def validate_fields_exist(
@@ -59,11 +69,13 @@ def validate_fields_exist(
     Returns:
         Tuple of (existing_fields, missing_fields)
     """
+    # One request for the entity's attribute names instead of a GET per field
+    attribute_names = client.list_attribute_logical_names(entity_logical_name)
+
     existing = []
     missing = []
     for field_name in field_names:
-        attr = client.get_attribute_metadata(entity_logical_name, field_name)
-        if attr:
+        if field_name in attribute_names:
             existing.append(field_name)
         else:
             missing.append(field_name)
@@ -103,15 +115,14 @@ def create_field_security(client: ELMClient, dry_run: bool = False) -> bool:
     existing_fields, missing_fields = validate_fields_exist(
         client,
         "fsi_environmentrequest",
-        list(APPROVER_FIELD_PERMISSIONS.keys()),
+        [field_name for field_name, *_ in APPROVER_FIELD_PERMISSIONS],
     )
 
     if missing_fields:
-        print(f"  ERROR: {len(missing_fields)} required field(s) not found:")
-        for field in missing_fields:
-            print(f"    - {field}")
-        print()
-        print("  Run create_dataverse_schema.py to create missing fields.")
+        report = [f"  ERROR: {len(missing_fields)} required field(s) not found:"]
+        report.extend(f"    - {field}" for field in missing_fields)
+        report += ["", "  Run create_dataverse_schema.py to create missing fields."]
+        sys.stdout.write("".join(f"{line}\n" for line in report))
         return False
 
     print(f"  All {len(existing_fields)} fields validated ✓")
@@ -120,7 +131,10 @@ def create_field_security(client: ELMClient, dry_run: bool = False) -> bool:
 
     # Check if profile already exists
     print("\n[Checking Existing Profiles]")
-    existing = client.get_field_security_profiles(f"name eq '{profile_name}'")
+    existing = client.get_field_security_profiles(
+        f"name eq '{profile_name}'",
+        cache_ttl=DRY_RUN_PROFILE_CACHE_TTL if dry_run else PROFILE_CACHE_TTL,
+    )
 
     if existing:
         profile_id = existing[0]["fieldsecurityprofileid"]
@@ -142,31 +156,67 @@ def create_field_security(client: ELMClient, dry_run: bool = False) -> bool:
     # Create field permissions
     print(f"\n[Creating Field Permissions]")
 
-    for field_name, permissions in APPROVER_FIELD_PERMISSIONS.items():
-        can_update = permissions["canupdate"] > 0
-
-        if dry_run:
-            update_label = "read+update" if can_update else "read-only"
-            print(f"  {field_name}: would set {update_label}")
-        elif profile_id:
-            try:
-                permission_data = {
+    # Status lines are collected and written once for the phase
+    report: list[str] = []
+    if dry_run:
+        for field_name, _, _, can_update in APPROVER_FIELD_PERMISSIONS:
+            update_label = "read+update" if can_update > 0 else "read-only"
+            report.append(f"  {field_name}: would set {update_label}")
+    elif profile_id:
+        from elm_client import batch_error
+
+        entity_name = "fsi_environmentrequest"
+
+        # Fetch the profile's permissions once and skip configured fields
+        # locally (a newly created profile has none)
+        configured = set()
+        if existing:
+            configured = {
+                (perm.get("entityname"), perm.get("attributelogicalname"))
+                for perm in client.get_field_permissions(profile_id)
+            }
+        to_create = [
+            row for row in APPROVER_FIELD_PERMISSIONS
+            if (entity_name, row[0]) not in configured
+        ]
+
+        # Create the remaining field permissions in a single $batch request
+        results: dict[str, dict] = {}
+        if to_create:
+            entries = [
+                {
                     "attributelogicalname": field_name,
-                    "canread": permissions["canread"],
-                    "cancreate": permissions["cancreate"],
-                    "canupdate": permissions["canupdate"],
-                    "entityname": "fsi_environmentrequest",
-                    "fieldsecurityprofileid@odata.bind": f"/fieldsecurityprofiles({profile_id})",
+                    "canread": can_read,
+                    "cancreate": can_create,
+                    "canupdate": can_update,
+                    "entityname": entity_name,
                 }
-                client.create_field_permission(permission_data)
-                update_label = "read+update" if can_update else "read-only"
-                print(f"  {field_name}: {update_label}")
-            except Exception as e:
-                # May fail if permission already exists
-                if "duplicate" in str(e).lower() or "already" in str(e).lower():
-                    print(f"  {field_name}: already configured")
-                else:
-                    print(f"  {field_name}: ERROR - {e}")
+                for field_name, can_read, can_create, can_update in to_create
+            ]
+            batch_results = client.batch_create_field_permissions(profile_id, entries)
+            results = {
+                field_name: result
+                for (field_name, *_), result in zip(to_create, batch_results)
+            }
+
+        for field_name, _, _, can_update in APPROVER_FIELD_PERMISSIONS:
+            result = results.get(field_name)
+            if result is None:
+                report.append(f"  {field_name}: already configured")
+                continue
+
+            error = batch_error(result)
+            duplicate = result["status"] in (409, 412) or any(
+                word in error.lower() for word in ("duplicate", "already")
+            )
+            if 200 <= result["status"] < 300:
+                update_label = "read+update" if can_update > 0 else "read-only"
+                report.append(f"  {field_name}: {update_label}")
+            elif duplicate:
+                report.append(f"  {field_name}: already configured")
+            else:
+                report.append(f"  {field_name}: ERROR - {error}")
+    sys.stdout.write("".join(f"{line}\n" for line in report))
 
     print("\n" + "=" * 60)
     if dry_run:
@@ -183,6 +233,13 @@ def create_field_security(client: ELMClient, dry_run: bool = False) -> bool:
     return True
 
 
+def _elm_client_cls() -> type[ELMClient]:
+    """Import ELMClient on demand so --help and argument errors skip requests/msal."""
+    from elm_client import ELMClient
+
+    return ELMClient
+
+
 def main():
     """CLI entry point."""
     parser = argparse.ArgumentParser(
@@ -227,25 +284,25 @@ def main():
     if not args.tenant_id or not args.environment_url:
         parser.error("--tenant-id and --environment-url are required")
 
+    ELMClient = _elm_client_cls()
+
     # Get client secret if needed
     client_secret = args.client_secret
     if not args.interactive and not client_secret:
         if args.client_id:
-            import getpass
             client_secret = getpass.getpass("Client secret: ")
 
     try:
-        client = ELMClient(
+        with ELMClient(
             tenant_id=args.tenant_id,
             environment_url=args.environment_url,
             client_id=args.client_id,
             client_secret=client_secret,
             interactive=args.interactive,
-        )
-
-        success = create_field_security(client, dry_run=args.dry_run)
-        if not success:
-            sys.exit(1)
+        ) as client:
+            success = create_field_security(client, dry_run=args.dry_run)
+            if not success:
+                sys.exit(1)
 
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
@@ -9,9 +9,11 @@ with appropriate privilege assignments.
 import argparse
 import os
 import sys
+from itertools import groupby
+from operator import itemgetter
 from typing import Optional
 
-from elm_client import ELMClient
+from elm_client import ELMClient, batch_entity_id, batch_error
 
 # Privilege depth constants
 DEPTH_USER = 1       # Own records only
@@ -19,6 +21,16 @@ DEPTH_BU = 2         # Business unit records
 DEPTH_PARENT_BU = 4  # Parent:Child business units
 DEPTH_ORG = 8        # Organization-wide
 
+DEPTH_NAMES = {
+    DEPTH_USER: "User",
+    DEPTH_BU: "BU",
+    DEPTH_PARENT_BU: "Parent:Child",
+    DEPTH_ORG: "Org",
+}
+
+# Seconds to reuse the on-disk privilege ID lookup (IDs are stable per environment)
+PRIVILEGE_CACHE_TTL = 86400
+
 # Role definitions with privilege matrices
 ROLES = {
     "ELM Requester": {
@@ -108,6 +120,16 @@ def get_privilege_name(operation: str, entity_logical_name: str) -> str:
     return f"{prefix}{entity_logical_name}"
 
 
+# ROLES flattened to one (role name, privilege name, depth) row per
+# assignment, in definition order (rows for a role are contiguous)
+_ROLE_PRIVILEGE_ROWS: list[tuple[str, str, int]] = [
+    (role_name, get_privilege_name(operation, entity), depth)
+    for role_name, role_def in ROLES.items()
+    for entity, operations in role_def["privileges"].items()
+    for operation, depth in operations.items()
+]
+
+
 def create_roles(client: ELMClient, dry_run: bool = False) -> bool:
     """
     Create ELM security roles with privilege assignments.
@@ -135,73 +157,100 @@ def create_roles(client: ELMClient, dry_run: bool = False) -> bool:
     bu_id = root_bu["businessunitid"]
     print(f"  Root BU: {root_bu.get('name', 'Unknown')} ({bu_id})")
 
-    # Get all privileges upfront for mapping
+    # Look up only the privileges the roles need, in one query
     print("\n[Loading Privilege Definitions]")
-    all_privileges = client.get_privileges()
-    privilege_map = {p["name"]: p["privilegeid"] for p in all_privileges}
-    print(f"  Loaded {len(privilege_map)} privileges")
+    required = {priv_name for _, priv_name, _ in _ROLE_PRIVILEGE_ROWS}
+    privilege_map = client.get_privilege_ids(list(required), cache_ttl=PRIVILEGE_CACHE_TTL)
+    print(f"  Loaded {len(privilege_map)} of {len(required)} privileges")
+
+    # Fetch all existing ELM roles in one query
+    existing_roles = client.get_roles(
+        filter_expr=" or ".join(f"name eq '{role_name}'" for role_name in ROLES)
+    )
+    role_ids: dict[str, str] = {}
+    for role in existing_roles:
+        role_ids.setdefault(role["name"], role["roleid"])
+
+    # Create all missing roles in one $batch request
+    missing = [role_name for role_name in ROLES if role_name not in role_ids]
+    created_roles: set[str] = set()
+    if missing and not dry_run:
+        results = client.batch([
+            ("POST", "roles", {
+                "name": role_name,
+                "description": ROLES[role_name]["description"],
+                "businessunitid@odata.bind": f"/businessunits({bu_id})",
+            })
+            for role_name in missing
+        ])
+        errors = []
+        for role_name, result in zip(missing, results):
+            if 200 <= result["status"] < 300:
+                role_ids[role_name] = batch_entity_id(result)
+                created_roles.add(role_name)
+            else:
+                errors.append(f"{role_name}: {batch_error(result)}")
+        if errors:
+            raise RuntimeError(f"Failed to create roles: {'; '.join(errors)}")
 
-    # Create each role
+    role_privileges = {
+        role_name: list(rows)
+        for role_name, rows in groupby(_ROLE_PRIVILEGE_ROWS, key=itemgetter(0))
+    }
+
+    # Create each role; each role's output is written once
     print("\n[Creating Security Roles]")
     for role_name, role_def in ROLES.items():
-        print(f"\n  {role_name}:")
-
-        # Check if role already exists
-        existing_roles = client.get_roles(filter_expr=f"name eq '{role_name}'")
-        if existing_roles:
-            role_id = existing_roles[0]["roleid"]
-            print(f"    Role exists: {role_id}")
-        elif dry_run:
-            print(f"    Would create role: {role_def['description']}")
-            role_id = None
+        report = [f"\n  {role_name}:"]
+
+        role_id = role_ids.get(role_name)
+        if role_name in created_roles:
+            report.append(f"    Created role: {role_id}")
+        elif role_id:
+            report.append(f"    Role exists: {role_id}")
         else:
-            # Create the role
-            role_data = {
-                "name": role_name,
-                "description": role_def["description"],
-                "businessunitid@odata.bind": f"/businessunits({bu_id})",
-            }
-            role_id = client.create_role(role_data)
-            print(f"    Created role: {role_id}")
-
-        # Assign privileges
-        print(f"    Privileges:")
-        for entity, operations in role_def["privileges"].items():
-            for operation, depth in operations.items():
-                priv_name = get_privilege_name(operation, entity)
-                priv_id = privilege_map.get(priv_name)
-
-                depth_name = {
-                    DEPTH_USER: "User",
-                    DEPTH_BU: "BU",
-                    DEPTH_PARENT_BU: "Parent:Child",
-                    DEPTH_ORG: "Org",
-                }.get(depth, str(depth))
-
-                if not priv_id:
-                    print(f"      {priv_name}: NOT FOUND (entity may not exist)")
-                    continue
-
-                if dry_run:
-                    print(f"      {priv_name}: would assign ({depth_name})")
-                elif role_id:
-                    try:
-                        client.add_role_privilege(role_id, priv_id, depth)
-                        print(f"      {priv_name}: assigned ({depth_name})")
-                    except Exception as e:
-                        print(f"      {priv_name}: ERROR - {e}")
-                        failed_operations.append({
-                            "role": role_name,
-                            "privilege": priv_name,
-                            "depth": depth_name,
-                            "error": str(e),
-                        })
+            report.append(f"    Would create role: {role_def['description']}")
+
+        # Resolve privileges, then assign them all in one request per role
+        report.append("    Privileges:")
+        to_assign = []
+        for _, priv_name, depth in role_privileges.get(role_name, []):
+            priv_id = privilege_map.get(priv_name)
+            depth_name = DEPTH_NAMES.get(depth, str(depth))
+
+            if not priv_id:
+                report.append(f"      {priv_name}: NOT FOUND (entity may not exist)")
+            elif dry_run:
+                report.append(f"      {priv_name}: would assign ({depth_name})")
+            else:
+                to_assign.append((priv_name, priv_id, depth, depth_name))
+
+        if role_id and to_assign:
+            try:
+                client.add_role_privileges(
+                    role_id, [(priv_id, depth) for _, priv_id, depth, _ in to_assign]
+                )
+            except Exception as e:
+                for priv_name, _, _, depth_name in to_assign:
+                    report.append(f"      {priv_name}: ERROR - {e}")
+                    failed_operations.append({
+                        "role": role_name,
+                        "privilege": priv_name,
+                        "depth": depth_name,
+                        "error": str(e),
+                    })
+            else:
+                report.extend(
+                    f"      {priv_name}: assigned ({depth_name})"
+                    for priv_name, _, _, depth_name in to_assign
+                )
+
+        sys.stdout.write("".join(f"{line}\n" for line in report))
 
     # Verify immutability for ELM Admin
     print("\n[Verifying ELM Admin Immutability]")
-    admin_roles = client.get_roles(filter_expr="name eq 'ELM Admin'")
-    if admin_roles and not dry_run:
-        admin_role_id = admin_roles[0]["roleid"]
+    admin_role_id = role_ids.get("ELM Admin")
+    if admin_role_id and not dry_run:
 
         # Check for forbidden privileges
         forbidden = [
@@ -209,8 +258,9 @@ def create_roles(client: ELMClient, dry_run: bool = False) -> bool:
             ("prvDeletefsi_provisioninglog", "Delete"),
         ]
 
-        admin_privs = client.get_role_privileges(admin_role_id)
-        admin_priv_names = {p.get("name", "") for p in admin_privs}
+        admin_priv_names = client.role_has_privileges(
+            admin_role_id, [priv_name for priv_name, _ in forbidden]
+        )
 
         all_good = True
         for priv_name, operation in forbidden:
@@ -303,17 +353,16 @@ def main():
             client_secret = getpass.getpass("Client secret: ")
 
     try:
-        client = ELMClient(
+        with ELMClient(
             tenant_id=args.tenant_id,
             environment_url=args.environment_url,
             client_id=args.client_id,
             client_secret=client_secret,
             interactive=args.interactive,
-        )
-
-        success = create_roles(client, dry_run=args.dry_run)
-        if not success and not args.dry_run:
-            sys.exit(1)
+        ) as client:
+            success = create_roles(client, dry_run=args.dry_run)
+            if not success and not args.dry_run:
+                sys.exit(1)
 
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
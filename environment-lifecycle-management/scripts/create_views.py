@@ -16,7 +16,7 @@ import os
 import sys
 from typing import Optional
 
-from elm_client import ELMClient
+from elm_client import ELMClient, batch_entity_id, batch_error
 
 # View definitions with FetchXML queries
 VIEWS = [
@@ -267,6 +267,91 @@ PROVISIONING_LOG_VIEWS = [
 ]
 
 
+def _layout_template(layoutxml: str, default_type_code: int) -> str:
+    """
+    Turn layout XML into a format string with a {type_code} placeholder.
+
+    Raises:
+        ValueError: If the default type code does not appear exactly once
+    """
+    marker = f'object="{default_type_code}"'
+    if layoutxml.count(marker) != 1:
+        raise ValueError(f"Layout XML must contain {marker} exactly once")
+    escaped = layoutxml.replace("{", "{{").replace("}", "}}")
+    return escaped.replace(marker, 'object="{type_code}"')
+
+
+# Precompile layout templates once; per-deployment work is a single format()
+for _view in VIEWS:
+    _view["layout_template"] = _layout_template(_view["layoutxml"], 10001)
+for _view in PROVISIONING_LOG_VIEWS:
+    _view["layout_template"] = _layout_template(_view["layoutxml"], 10002)
+del _view
+
+
+def _existing_views(client: ELMClient, views: list[dict]) -> set[tuple[str, str]]:
+    """
+    Find which views already exist, across all their entities, in one query.
+
+    Returns:
+        (entity logical name, view name) pairs of existing views
+    """
+    entity_filter = " or ".join(
+        f"returnedtypecode eq '{entity}'" for entity in sorted({v["entity"] for v in views})
+    )
+    name_filter = " or ".join(f"name eq '{view['name']}'" for view in views)
+    rows = client.query(
+        "savedqueries",
+        select=["name", "returnedtypecode"],
+        filter_expr=f"({entity_filter}) and ({name_filter})",
+    )
+    return {(row["returnedtypecode"], row["name"]) for row in rows}
+
+
+def _plan_entity_views(
+    views: list[dict],
+    existing: set[tuple[str, str]],
+    type_code: int,
+    dry_run: bool,
+) -> tuple[list[tuple[str, Optional[str]]], list[dict]]:
+    """
+    Work out which views for one entity are missing.
+
+    Returns:
+        (view name, status line) pairs in definition order, with None as the
+        status of views to create, and the savedquery records to create
+    """
+    report: list[tuple[str, Optional[str]]] = []
+    to_create = []
+    for view in views:
+        view_name = view["name"]
+        entity = view["entity"]
+
+        if (entity, view_name) in existing:
+            report.append((view_name, "    Already exists, skipping"))
+            continue
+
+        if dry_run:
+            report.append((view_name, f"    Would create: {view['description']}"))
+            continue
+
+        # Fill in the entity type code
+        layout = view["layout_template"].format(type_code=type_code)
+
+        report.append((view_name, None))
+        to_create.append({
+            "name": view_name,
+            "description": view["description"],
+            "returnedtypecode": entity,
+            "querytype": view["querytype"],
+            "isdefault": view["isdefault"],
+            "fetchxml": view["fetchxml"],
+            "layoutxml": layout,
+        })
+
+    return report, to_create
+
+
 def create_views(client: ELMClient, dry_run: bool = False) -> None:
     """Create model-driven app views for ELM entities."""
     print("\n" + "=" * 60)
@@ -294,84 +379,36 @@ def create_views(client: ELMClient, dry_run: bool = False) -> None:
     else:
         print("  ProvisioningLog table not found, will skip ProvisioningLog views")
 
-    # Create EnvironmentRequest views
-    print("\n[Creating EnvironmentRequest Views]")
-    for view in VIEWS:
-        view_name = view["name"]
-        entity = view["entity"]
-
-        # Check if view already exists
-        existing = client.get_saved_queries(entity, f"name eq '{view_name}'")
-        if existing:
-            print(f"\n  {view_name}:")
-            print(f"    Already exists, skipping")
-            continue
-
-        if dry_run:
-            print(f"\n  {view_name}:")
-            print(f"    Would create: {view['description']}")
-            continue
-
-        # Update layout XML with correct type code
-        layout = view["layoutxml"].replace("object=\"10001\"", f"object=\"{er_type_code}\"")
-
-        query_data = {
-            "name": view_name,
-            "description": view["description"],
-            "returnedtypecode": entity,
-            "querytype": view["querytype"],
-            "isdefault": view["isdefault"],
-            "fetchxml": view["fetchxml"],
-            "layoutxml": layout,
-        }
-
-        try:
-            query_id = client.create_saved_query(query_data)
-            print(f"\n  {view_name}:")
-            print(f"    Created: {query_id}")
-        except Exception as e:
-            print(f"\n  {view_name}:")
-            print(f"    ERROR: {e}")
-
-    # Create ProvisioningLog views
+    # Check existing views once, then create all missing views in one $batch
+    existing = _existing_views(client, VIEWS + (PROVISIONING_LOG_VIEWS if pl_metadata else []))
+    sections = [
+        ("EnvironmentRequest", *_plan_entity_views(VIEWS, existing, er_type_code, dry_run)),
+    ]
     if pl_metadata:
-        print("\n[Creating ProvisioningLog Views]")
-        for view in PROVISIONING_LOG_VIEWS:
-            view_name = view["name"]
-            entity = view["entity"]
-
-            # Check if view already exists
-            existing = client.get_saved_queries(entity, f"name eq '{view_name}'")
-            if existing:
-                print(f"\n  {view_name}:")
-                print(f"    Already exists, skipping")
-                continue
-
-            if dry_run:
-                print(f"\n  {view_name}:")
-                print(f"    Would create: {view['description']}")
-                continue
-
-            # Update layout XML with correct type code
-            layout = view["layoutxml"].replace("object=\"10002\"", f"object=\"{pl_type_code}\"")
-
-            query_data = {
-                "name": view_name,
-                "description": view["description"],
-                "returnedtypecode": entity,
-                "querytype": view["querytype"],
-                "isdefault": view["isdefault"],
-                "fetchxml": view["fetchxml"],
-                "layoutxml": layout,
-            }
-
-            try:
-                query_id = client.create_saved_query(query_data)
-                print(f"\n  {view_name}:")
-                print(f"    Created: {query_id}")
-            except Exception as e:
-                print(f"\n  {view_name}:")
-                print(f"    ERROR: {e}")
+        sections.append(
+            ("ProvisioningLog", *_plan_entity_views(
+                PROVISIONING_LOG_VIEWS, existing, pl_type_code, dry_run
+            ))
+        )
+
+    to_create = [query_data for _, _, queries in sections for query_data in queries]
+    statuses = []
+    if to_create:
+        results = client.batch([("POST", "savedqueries", q) for q in to_create])
+        for result in results:
+            if 200 <= result["status"] < 300:
+                statuses.append(f"    Created: {batch_entity_id(result)}")
+            else:
+                statuses.append(f"    ERROR: {batch_error(result)}")
+    created = iter(statuses)
+
+    lines = []
+    for label, report, _ in sections:
+        lines.append(f"\n[Creating {label} Views]")
+        for view_name, status in report:
+            lines.append(f"\n  {view_name}:")
+            lines.append(status if status is not None else next(created))
+    sys.stdout.write("".join(f"{line}\n" for line in lines))
 
     print("\n" + "=" * 60)
     if dry_run:
@@ -433,15 +470,14 @@ def main():
             client_secret = getpass.getpass("Client secret: ")
 
     try:
-        client = ELMClient(
+        with ELMClient(
             tenant_id=args.tenant_id,
             environment_url=args.environment_url,
             client_id=args.client_id,
             client_secret=client_secret,
             interactive=args.interactive,
-        )
-
-        create_views(client, dry_run=args.dry_run)
+        ) as client:
+            create_views(client, dry_run=args.dry_run)
 
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
@@ -33,35 +33,172 @@ Usage:
         --tenant-id <tenant-id> --client-id <app-id> --client-secret <secret>
 """
 
+from __future__ import annotations
+
 import argparse
+import io
 import os
 import sys
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Optional
+
+# Phase modules and the client (requests/msal) are imported where they are
+# used, so --help, argument errors and partial deployments load only what
+# they need
+if TYPE_CHECKING:
+    from elm_client import ELMClient
+
+
+# Fixed report text, each written to stdout in a single call
+_RULE = "=" * 70
+
+_BANNER = f"""
+{_RULE}
+  Environment Lifecycle Management - Dataverse Deployment
+{_RULE}
+
+  This script deploys ELM components to Dataverse:
+    - Option sets (choices) for state, zone, region, etc.
+    - EnvironmentRequest table (user-owned, 22 columns)
+    - ProvisioningLog table (org-owned, 11 columns, immutable)
+    - Security roles (Requester, Approver, Admin, Auditor)
+    - Business rules (conditional required fields)
+    - Model-driven app views
+    - Field security profiles
+
+"""
+
+_DRY_RUN_SUMMARY = f"""
+{_RULE}
+  DRY RUN COMPLETE
+  Review output above to see what would be created.
+  Run without --dry-run to apply changes.
+{_RULE}
+
+"""
+
+_DEPLOY_SUMMARY = f"""
+{_RULE}
+  DEPLOYMENT COMPLETE
+
+  Next Steps:
+    1. Register Service Principal in PPAC (manual)
+       python register_service_principal.py --help
+
+    2. Create Environment Groups in PPAC (manual)
+       - FSI-Zone1-PersonalProductivity
+       - FSI-Zone2-TeamCollaboration
+       - FSI-Zone3-EnterpriseManagedEnvironment
+
+    3. Create Copilot Studio agent (manual)
+       See docs/copilot-agent-setup.md
+
+    4. Create Power Automate flows (manual)
+       See docs/flow-configuration.md
+
+    5. Validate deployment:
+       python verify_role_privileges.py --environment-url ...
+       python validate_immutability.py --environment-url ...
+{_RULE}
+
+"""
+
+
+class _PhaseOutput(io.TextIOBase):
+    """
+    stdout replacement that captures output per worker thread.
+
+    Threads that registered a buffer write to it; all other threads write
+    straight to the wrapped stream. This keeps concurrent phases from
+    interleaving their output line by line.
+    """
 
-from elm_client import ELMClient
-from create_dataverse_schema import create_schema
-from create_security_roles import create_roles
-from create_business_rules import create_business_rules
-from create_views import create_views
-from create_field_security import create_field_security
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def capture(self, buffer: Optional[io.StringIO]) -> None:
+        """Route this thread's output to buffer (None restores the stream)."""
+        self._local.buffer = buffer
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer or self._stream).write(text)
+
+    def flush(self) -> None:
+        self._stream.flush()
+
+
+class _PhaseError(Exception):
+    """Carries a failed phase's buffered output alongside its exception."""
+
+    def __init__(self, output: str):
+        super().__init__(output)
+        self.output = output
+
+
+def _phase_banner(title: str) -> None:
+    """Print a deployment phase heading."""
+    sys.stdout.write(f"\n{_RULE}\n  {title}\n{_RULE}\n")
+
+
+def run_phases(
+    phases: list[tuple[str, Callable[[], None]]], sequential: bool = False
+) -> None:
+    """
+    Run independent deployment phases, concurrently unless sequential.
+
+    Concurrent phases share the (thread-safe) client. Each phase's output
+    is buffered and printed as one block in the listed order, so the log
+    reads the same as a sequential run. Every phase runs to completion
+    even if another fails; the first failure is then re-raised.
+
+    Args:
+        phases: (title, callable) pairs
+        sequential: Run phases one at a time with live output
+    """
+    if sequential:
+        for title, run in phases:
+            _phase_banner(title)
+            run()
+        return
+
+    output = _PhaseOutput(sys.stdout)
+
+    def run_captured(title: str, run: Callable[[], None]) -> str:
+        buffer = io.StringIO()
+        output.capture(buffer)
+        try:
+            _phase_banner(title)
+            run()
+        except Exception as e:
+            raise _PhaseError(buffer.getvalue()) from e
+        finally:
+            output.capture(None)
+        return buffer.getvalue()
+
+    stdout, sys.stdout = sys.stdout, output
+    try:
+        with ThreadPoolExecutor(max_workers=len(phases)) as executor:
+            futures = [executor.submit(run_captured, title, run) for title, run in phases]
+    finally:
+        sys.stdout = stdout
+
+    failure = None
+    for future in futures:
+        try:
+            sys.stdout.write(future.result())
+        except _PhaseError as e:
+            sys.stdout.write(e.output)
+            failure = failure or e.__cause__
+    if failure is not None:
+        raise failure
 
 
 def print_banner():
     """Print deployment banner."""
-    print()
-    print("=" * 70)
-    print("  Environment Lifecycle Management - Dataverse Deployment")
-    print("=" * 70)
-    print()
-    print("  This script deploys ELM components to Dataverse:")
-    print("    - Option sets (choices) for state, zone, region, etc.")
-    print("    - EnvironmentRequest table (user-owned, 22 columns)")
-    print("    - ProvisioningLog table (org-owned, 11 columns, immutable)")
-    print("    - Security roles (Requester, Approver, Admin, Auditor)")
-    print("    - Business rules (conditional required fields)")
-    print("    - Model-driven app views")
-    print("    - Field security profiles")
-    print()
+    sys.stdout.write(_BANNER)
 
 
 def preflight_check(client: ELMClient) -> dict:
@@ -117,9 +254,9 @@ def preflight_check(client: ELMClient) -> dict:
         "fsi_datasensitivity",
         "fsi_provisioningaction",
     ]
+    found = client.get_global_optionsets(optionsets_to_check)
     for optionset in optionsets_to_check:
-        existing = client.get_global_optionset(optionset)
-        exists = existing is not None
+        exists = found[optionset] is not None
         status["option_sets"][optionset] = exists
         marker = "exists" if exists else "not found"
         symbol = "✓" if exists else "○"
@@ -129,9 +266,14 @@ def preflight_check(client: ELMClient) -> dict:
     print()
     print("  Checking existing security roles...")
     roles_to_check = ["ELM Requester", "ELM Approver", "ELM Admin", "ELM Auditor"]
+    found_roles = {
+        role["name"]
+        for role in client.get_roles(
+            filter_expr=" or ".join(f"name eq '{role_name}'" for role_name in roles_to_check)
+        )
+    }
     for role_name in roles_to_check:
-        existing = client.get_roles(filter_expr=f"name eq '{role_name}'")
-        exists = len(existing) > 0
+        exists = role_name in found_roles
         status["roles"][role_name] = exists
         marker = "exists" if exists else "not found"
         symbol = "✓" if exists else "○"
@@ -168,6 +310,9 @@ def deploy(
     tables_only: bool = False,
     roles_only: bool = False,
     verbose: bool = False,
+    force: bool = False,
+    sequential: bool = False,
+    verify_connection: bool = False,
 ) -> bool:
     """
     Deploy all ELM components to Dataverse.
@@ -178,6 +323,10 @@ def deploy(
         tables_only: If True, only deploy tables and schema
         roles_only: If True, only deploy security roles
         verbose: If True, show additional output
+        force: If True, redeploy the schema even if it is unchanged
+        sequential: If True, run phases 2-5 one at a time instead of concurrently
+        verify_connection: If True, query the organization before deploying.
+            Otherwise connection and auth errors surface on the first phase.
 
     Returns:
         True if deployment succeeded, False otherwise
@@ -188,7 +337,7 @@ def deploy(
         # Run pre-flight check for dry-run mode
         if dry_run:
             preflight_check(client)
-        else:
+        elif verify_connection:
             # Test connection first
             print("[Testing Connection]")
             org = client.test_connection()
@@ -197,73 +346,46 @@ def deploy(
 
         if roles_only:
             # Only deploy security roles
+            from create_security_roles import create_roles
+
             create_roles(client, dry_run=dry_run)
 
         elif tables_only:
             # Only deploy schema (option sets, tables, columns)
-            create_schema(client, dry_run=dry_run)
-
-        else:
-            # Full deployment
-            # Phase 1: Schema (option sets, tables, columns)
-            print("\n" + "=" * 70)
-            print("  PHASE 1: Dataverse Schema")
-            print("=" * 70)
-            create_schema(client, dry_run=dry_run)
-
-            # Phase 2: Security Roles
-            print("\n" + "=" * 70)
-            print("  PHASE 2: Security Roles")
-            print("=" * 70)
-            create_roles(client, dry_run=dry_run)
+            from create_dataverse_schema import create_schema
 
-            # Phase 3: Business Rules
-            print("\n" + "=" * 70)
-            print("  PHASE 3: Business Rules")
-            print("=" * 70)
-            create_business_rules(client, dry_run=dry_run)
+            create_schema(client, dry_run=dry_run, force=force)
 
-            # Phase 4: Views
-            print("\n" + "=" * 70)
-            print("  PHASE 4: Model-Driven App Views")
-            print("=" * 70)
-            create_views(client, dry_run=dry_run)
+        else:
+            # Full deployment; import every phase up front rather than from
+            # the worker threads
+            from create_business_rules import create_business_rules
+            from create_dataverse_schema import create_schema
+            from create_field_security import create_field_security
+            from create_security_roles import create_roles
+            from create_views import create_views
 
-            # Phase 5: Field Security
-            print("\n" + "=" * 70)
-            print("  PHASE 5: Field Security Profiles")
-            print("=" * 70)
-            create_field_security(client, dry_run=dry_run)
+            # Phase 1: Schema (option sets, tables, columns)
+            _phase_banner("PHASE 1: Dataverse Schema")
+            create_schema(client, dry_run=dry_run, force=force)
+
+            # Phases 2-5 depend only on the schema, not on each other
+            run_phases(
+                [
+                    ("PHASE 2: Security Roles",
+                     lambda: create_roles(client, dry_run=dry_run)),
+                    ("PHASE 3: Business Rules",
+                     lambda: create_business_rules(client, dry_run=dry_run)),
+                    ("PHASE 4: Model-Driven App Views",
+                     lambda: create_views(client, dry_run=dry_run)),
+                    ("PHASE 5: Field Security Profiles",
+                     lambda: create_field_security(client, dry_run=dry_run)),
+                ],
+                sequential=sequential,
+            )
 
         # Final summary
-        print("\n" + "=" * 70)
-        if dry_run:
-            print("  DRY RUN COMPLETE")
-            print("  Review output above to see what would be created.")
-            print("  Run without --dry-run to apply changes.")
-        else:
-            print("  DEPLOYMENT COMPLETE")
-            print()
-            print("  Next Steps:")
-            print("    1. Register Service Principal in PPAC (manual)")
-            print("       python register_service_principal.py --help")
-            print()
-            print("    2. Create Environment Groups in PPAC (manual)")
-            print("       - FSI-Zone1-PersonalProductivity")
-            print("       - FSI-Zone2-TeamCollaboration")
-            print("       - FSI-Zone3-EnterpriseManagedEnvironment")
-            print()
-            print("    3. Create Copilot Studio agent (manual)")
-            print("       See docs/copilot-agent-setup.md")
-            print()
-            print("    4. Create Power Automate flows (manual)")
-            print("       See docs/flow-configuration.md")
-            print()
-            print("    5. Validate deployment:")
-            print("       python verify_role_privileges.py --environment-url ...")
-            print("       python validate_immutability.py --environment-url ...")
-        print("=" * 70)
-        print()
+        sys.stdout.write(_DRY_RUN_SUMMARY if dry_run else _DEPLOY_SUMMARY)
 
     except Exception as e:
         print(f"\nERROR: {e}", file=sys.stderr)
@@ -338,6 +460,31 @@ Examples:
         action="store_true",
         help="Only deploy security roles (skip tables, rules, views)",
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Redeploy the schema even if unchanged since the last deployment",
+    )
+    parser.add_argument(
+        "--verify-connection",
+        action="store_true",
+        help="Check the connection and report the organization before deploying",
+    )
+    parser.add_argument(
+        "--sequential",
+        action="store_true",
+        help="Run deployment phases one at a time (useful for debugging)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the on-disk lookup cache",
+    )
+    parser.add_argument(
+        "--flush-cache",
+        action="store_true",
+        help="Discard cached lookups for this environment before deploying",
+    )
     parser.add_argument(
         "--verbose",
         action="store_true",
@@ -368,24 +515,32 @@ Examples:
         print("*** DRY RUN MODE - No changes will be made ***")
         print()
 
+    from elm_client import DEFAULT_CACHE_TTL, ELMClient
+
     try:
         # Initialize client
-        client = ELMClient(
+        with ELMClient(
             tenant_id=args.tenant_id,
             environment_url=args.environment_url,
             client_id=args.client_id,
             client_secret=client_secret,
             interactive=args.interactive,
-        )
-
-        # Run deployment
-        success = deploy(
-            client,
-            dry_run=args.dry_run,
-            tables_only=args.tables_only,
-            roles_only=args.roles_only,
-            verbose=args.verbose,
-        )
+            cache_ttl=0 if args.no_cache else DEFAULT_CACHE_TTL,
+        ) as client:
+            if args.flush_cache:
+                client.clear_cache()
+
+            # Run deployment
+            success = deploy(
+                client,
+                dry_run=args.dry_run,
+                tables_only=args.tables_only,
+                roles_only=args.roles_only,
+                verbose=args.verbose,
+                force=args.force,
+                sequential=args.sequential,
+                verify_connection=args.verify_connection,
+            )
 
         sys.exit(0 if success else 1)
 
@@ -6,14 +6,441 @@ Uses MSAL Confidential Client for app-only authentication.
 """
 
 import argparse
+import hashlib
 import json
+import logging
 import os
+import random
+import re
 import sys
-from typing import Any, Optional
-from urllib.parse import urljoin
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional, Union
+from urllib.parse import quote_plus, unquote, urlencode
+from xml.etree import ElementTree
 
-import msal
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # Optional accelerator; stdlib json is used otherwise
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Session-level headers sent on every Web API request (Authorization is added
+# per call). Responses use minimal OData metadata and no annotations unless
+# requested.
+_STATIC_HEADERS = {
+    "Content-Type": "application/json",
+    "OData-MaxVersion": "4.0",
+    "OData-Version": "4.0",
+    "Accept": "application/json;odata.metadata=minimal",
+}
+_ANNOTATIONS_PREFER = "odata.include-annotations=*"
+
+# Dataverse accepts at most 1000 operations in a single $batch request
+BATCH_MAX_OPERATIONS = 1000
+
+# Records per CreateMultiple/UpdateMultiple request; smaller requests stay well
+# inside the two-minute server timeout on tables with plug-ins
+BULK_CHUNK_SIZE = 500
+
+# Prefer header asking for the written record in create/update responses
+RETURN_REPRESENTATION = "return=representation"
+
+# Characters left unescaped in OData query strings
+_ODATA_SAFE = "$,()'"
+
+# Record GUID in an OData-EntityId header, e.g. .../accounts(<guid>)
+_GUID_RE = re.compile(r"\(([0-9a-fA-F-]{36})\)")
+
+# Pooled connections kept per host; sized for concurrent deployment requests
+HTTP_POOL_SIZE = 32
+
+# Connection-level retries in the transport (failures before a request is
+# sent, safe for any method). This is the only layer that retries connection
+# failures; read timeouts and status-based retries happen in ELMClient._request.
+HTTP_RETRY = Retry(total=3, connect=3, read=0, status=0, backoff_factor=0.3)
+
+# Default (connect, read) timeout in seconds for Web API requests. The read
+# timeout sits just above Dataverse's two-minute server-side limit.
+HTTP_TIMEOUT = (10, 150)
+
+# Seconds the background connection warm-up may take before requests stop
+# waiting for it
+WARMUP_TIMEOUT = 5
+
+# Retries per request for throttled or transiently failing calls
+HTTP_MAX_RETRIES = 5
+
+# Throttled/unavailable: Dataverse did not process the request, so any method
+# may be retried (honoring Retry-After)
+THROTTLE_STATUSES = frozenset({429, 503})
+
+# Requests in flight at once per client. Dataverse allows 52 concurrent
+# requests per user; staying well below leaves room for other sessions.
+HTTP_MAX_CONCURRENCY = 16
+
+# Service protection headers: when the remaining request count or execution
+# time (ms) in the current window drops below these, pause before returning
+# so the next call does not trip a 429
+RATE_LIMIT_REQUESTS_HEADER = "x-ms-ratelimit-burst-remaining-xrm-requests"
+RATE_LIMIT_TIME_HEADER = "x-ms-ratelimit-time-remaining-xrm-requests"
+RATE_LIMIT_MIN_REQUESTS = 50
+RATE_LIMIT_MIN_TIME_MS = 10_000
+RATE_LIMIT_PAUSE = 2.0
+
+# Transient failures retried only for idempotent methods
+TRANSIENT_STATUSES = frozenset({408, 500, 502, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "PATCH", "DELETE"})
+
+# Rows per page requested for OData and FetchXML queries (Dataverse maximum is 5000)
+QUERY_PAGE_SIZE = 5000
+
+# Dataverse stops counting at this many records in @odata.count
+ODATA_COUNT_LIMIT = 5000
+
+# Seconds a cached lookup is served without revalidating against Dataverse
+DEFAULT_CACHE_TTL = 300
+
+# Seconds a metadata "not found" result is trusted before asking again
+METADATA_MISS_TTL = 30
+
+# Root directory for on-disk lookup caches (one subdirectory per environment)
+CACHE_ROOT = Path(os.environ.get("ELM_CACHE_DIR", Path.home() / ".cache" / "elm"))
+
+# Seconds before expiry at which a held access token is refreshed
+TOKEN_REFRESH_MARGIN = 60
+
+# Persisted MSAL token cache shared by all ELM script runs (owner read/write only)
+TOKEN_CACHE_FILE = CACHE_ROOT / "msal_token_cache.json"
+
+# json.dumps separators matching orjson's compact output
+_COMPACT_SEPARATORS = (",", ":")
+
+
+def _dumps(data: Any) -> bytes:
+    """
+    Serialize a request payload to UTF-8 JSON bytes (orjson when installed).
+
+    Output is compact (no whitespace between tokens) either way. Bytes are
+    treated as already-serialized JSON and returned unchanged, so callers can
+    encode fixed payloads once and pass them to create()/update() directly.
+    """
+    if isinstance(data, bytes):
+        return data
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=_COMPACT_SEPARATORS).encode("utf-8")
+
+
+def _loads(data: Union[bytes, str]) -> Any:
+    """Parse a JSON response body or cache entry (orjson when installed)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _build_batch_body(
+    api_url: str,
+    operations: list[tuple[str, str, Union[dict, bytes, None]]],
+    boundary: str,
+    changeset: bool,
+) -> bytes:
+    """
+    Build a multipart/mixed $batch request body.
+
+    Args:
+        api_url: Web API base URL (ending with '/')
+        operations: List of (method, relative_url, body) tuples. A bytes body
+                    is treated as pre-serialized UTF-8 JSON and sent as is.
+        boundary: Batch boundary marker
+        changeset: Wrap write operations in a single atomic changeset
+
+    Returns:
+        UTF-8 encoded request body with CRLF line endings
+    """
+    chunks: list[bytes] = []
+
+    def emit(*lines: str) -> None:
+        chunks.append("".join(f"{line}\r\n" for line in lines).encode("utf-8"))
+
+    def request_part(method: str, url: str, body: Union[dict, bytes, None], content_id: int) -> None:
+        emit("Content-Type: application/http", "Content-Transfer-Encoding: binary")
+        if changeset:
+            emit(f"Content-ID: {content_id}")
+        emit("", f"{method} {api_url}{url} HTTP/1.1")
+        if body is not None:
+            emit("Content-Type: application/json; type=entry", "")
+            chunks.append(_dumps(body))
+            chunks.append(b"\r\n")
+        else:
+            emit("Accept: application/json", "")
+
+    if changeset:
+        changeset_boundary = f"changeset_{uuid.uuid4()}"
+        emit(
+            f"--{boundary}",
+            f"Content-Type: multipart/mixed; boundary={changeset_boundary}",
+            "",
+        )
+        for index, (method, url, body) in enumerate(operations, start=1):
+            emit(f"--{changeset_boundary}")
+            request_part(method, url, body, index)
+        emit(f"--{changeset_boundary}--")
+    else:
+        for index, (method, url, body) in enumerate(operations, start=1):
+            emit(f"--{boundary}")
+            request_part(method, url, body, index)
+    chunks.append(f"--{boundary}--\r\n".encode("utf-8"))
+    return b"".join(chunks)
+
+
+def _parse_batch_response(content_type: str, text: str) -> list[dict]:
+    """
+    Parse a multipart/mixed $batch response.
+
+    Args:
+        content_type: Response Content-Type header (carries the boundary)
+        text: Response body
+
+    Returns:
+        List of {"status", "headers", "body"} dicts in response order
+    """
+    boundary = content_type.split("boundary=", 1)[-1].strip().strip('"')
+    results = []
+    for part in text.split(f"--{boundary}")[1:]:
+        if part.startswith("--"):
+            break
+        part_headers, _, part_body = part.strip("\r\n").partition("\r\n\r\n")
+        if "multipart/mixed" in part_headers:
+            nested_type = next(
+                line for line in part_headers.split("\r\n")
+                if line.lower().startswith("content-type:")
+            )
+            results.extend(_parse_batch_response(nested_type, part_body))
+            continue
+
+        head, _, body = part_body.partition("\r\n\r\n")
+        status_line, *header_lines = head.split("\r\n")
+        headers = {}
+        for line in header_lines:
+            name, _, value = line.partition(":")
+            headers[name.strip()] = value.strip()
+        body = body.strip()
+        results.append({
+            "status": int(status_line.split(" ")[1]),
+            "headers": headers,
+            "body": _loads(body) if body.startswith("{") else None,
+        })
+    return results
+
+
+def _build_filter(clauses: Iterable[Optional[str]]) -> str:
+    """Join OData filter clauses with "and", skipping empty or None clauses."""
+    return " and ".join(clause for clause in clauses if clause)
+
+
+@lru_cache(maxsize=128)
+def _encode_fetchxml(fetchxml: str) -> str:
+    """URL-encode a FetchXML query once; queries are usually reused constants."""
+    return quote_plus(fetchxml)
+
+
+def _fetchxml_paging_cookie(page: dict) -> Optional[str]:
+    """
+    Extract the paging cookie for the next FetchXML page, if the page has one.
+
+    The annotation is a <cookie> element whose pagingcookie attribute is
+    URL-encoded twice.
+    """
+    cookie = page.get("@Microsoft.Dynamics.CRM.fetchxmlpagingcookie")
+    if not cookie:
+        return None
+    return unquote(unquote(ElementTree.fromstring(cookie).get("pagingcookie", ""))) or None
+
+
+def _paginate(
+    fetch: Callable[[Any], dict],
+    first: Any,
+    next_of: Callable[[Any, dict], Any],
+    prefetch: bool = False,
+) -> Iterator[dict]:
+    """
+    Yield records from successive pages, each located from the previous one.
+
+    Args:
+        fetch: Returns the page at a locator (a next link, a page number, ...)
+        first: Locator of the first page
+        next_of: Returns the locator after (locator, page), or None at the end
+        prefetch: Fetch the next page on a background thread while the
+                  current one is consumed (at most two pages in memory)
+    """
+    if not prefetch:
+        locator = first
+        while locator is not None:
+            page = fetch(locator)
+            yield from page.get("value", [])
+            locator = next_of(locator, page)
+        return
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="elm-prefetch") as prefetcher:
+        locator, page = first, fetch(first)
+        while True:
+            locator = next_of(locator, page)
+            pending = prefetcher.submit(fetch, locator) if locator is not None else None
+            yield from page.get("value", [])
+            if pending is None:
+                return
+            page = pending.result()
+
+
+def _record_id(entity_id: str) -> str:
+    """Extract the record GUID from an OData-EntityId URL ("" if absent)."""
+    match = _GUID_RE.search(entity_id)
+    return match.group(1) if match else ""
+
+
+def batch_entity_id(result: dict) -> str:
+    """Extract the created record ID from a $batch operation result."""
+    return _record_id(result["headers"].get("OData-EntityId", ""))
+
+
+def batch_error(result: dict) -> str:
+    """Get a readable error message from a failed $batch operation result."""
+    error = (result.get("body") or {}).get("error", {})
+    return error.get("message") or f"HTTP {result['status']}"
+
+
+def _retry_delay(attempt: int, response: Optional[requests.Response] = None) -> float:
+    """Seconds to wait before retry attempt (0-based), honoring Retry-After."""
+    if response is not None:
+        try:
+            return max(0.0, float(response.headers["Retry-After"]))
+        except (KeyError, ValueError):
+            pass
+    return min(60.0, 2 ** attempt + random.uniform(0, 0.5))
+
+
+def _near_rate_limit(response: requests.Response) -> bool:
+    """Check Dataverse service protection headers for a nearly spent budget."""
+    headers = response.headers
+    try:
+        requests_left = headers.get(RATE_LIMIT_REQUESTS_HEADER)
+        if requests_left is not None and int(requests_left) < RATE_LIMIT_MIN_REQUESTS:
+            return True
+        time_left = headers.get(RATE_LIMIT_TIME_HEADER)
+        return time_left is not None and float(time_left) < RATE_LIMIT_MIN_TIME_MS
+    except ValueError:
+        return False
+
+
+def _cache_directory(environment_url: str) -> Path:
+    """Return the per-environment directory under CACHE_ROOT."""
+    digest = hashlib.sha256(environment_url.lower().encode("utf-8")).hexdigest()[:16]
+    return CACHE_ROOT / digest
+
+
+class ConcurrencyError(RuntimeError):
+    """A conditional write failed (412): the record changed since it was read."""
+
+
+class DataverseAPIError(requests.HTTPError):
+    """
+    A Web API request failed (4xx/5xx).
+
+    The message carries the Dataverse error code and message from the
+    response body, so callers can report the cause without re-issuing the
+    request. Subclasses requests.HTTPError; e.response is the response.
+    """
+
+    def __init__(self, response: requests.Response):
+        self.status_code = response.status_code
+        self.code = ""
+        try:
+            error = _loads(response.content).get("error") or {}
+            self.code = error.get("code", "")
+            detail = error.get("message", "")
+        except (ValueError, AttributeError):
+            detail = response.text[:500]
+        message = f"{response.status_code} {response.reason} for url: {response.url}"
+        if detail:
+            message += f": {detail}"
+        if self.code:
+            message += f" ({self.code})"
+        super().__init__(message, response=response)
+
+
+def _check_response(response: requests.Response) -> None:
+    """Raise DataverseAPIError for a failed response; success bodies are not parsed."""
+    if response.status_code >= 400:
+        raise DataverseAPIError(response)
+
+
+class _DiskCache:
+    """
+    JSON file cache for Dataverse lookups, scoped to one environment.
+
+    Entries store the response value, its ETag (if any) and the time it was
+    stored. Reads and writes are best-effort: I/O errors behave like a miss.
+    """
+
+    def __init__(self, environment_url: str, ttl: int):
+        self.directory = _cache_directory(environment_url)
+        self.ttl = ttl
+
+    def _path(self, key: str) -> Path:
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in key)
+        return self.directory / f"{safe}.json"
+
+    def load(self, key: str) -> Optional[dict]:
+        """Return the cached entry for key, or None."""
+        try:
+            return _loads(self._path(key).read_bytes())
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, entry: dict, ttl: Optional[int] = None) -> bool:
+        """Check whether an entry is still within the TTL (or an override)."""
+        return time.time() - entry.get("stored", 0) < (self.ttl if ttl is None else ttl)
+
+    def store(self, key: str, value: Any, etag: Optional[str] = None) -> None:
+        """Persist a value (and its ETag) for key."""
+        entry = {"stored": time.time(), "etag": etag, "value": value}
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Per-thread temp name: concurrent deploy phases may store the same key
+            tmp = self._path(key).with_suffix(f".{threading.get_ident()}.tmp")
+            tmp.write_bytes(_dumps(entry))
+            os.replace(tmp, self._path(key))
+        except OSError:
+            pass
+
+    def invalidate(self, prefix: str) -> None:
+        """Drop all entries whose key starts with prefix."""
+        # Not .stem: for an empty prefix the name is ".json", a dotfile stem
+        safe = self._path(prefix).name[: -len(".json")]
+        try:
+            for path in self.directory.glob(f"{safe}*.json"):
+                path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        """Remove every file in the directory: entries and other local state."""
+        try:
+            for path in self.directory.iterdir():
+                if path.is_file():
+                    path.unlink(missing_ok=True)
+        except OSError:
+            pass
 
 
 class ELMClient:
@@ -26,6 +453,9 @@ class ELMClient:
         client_id: Optional[str] = None,
         client_secret: Optional[str] = None,
         interactive: bool = False,
+        cache_ttl: int = DEFAULT_CACHE_TTL,
+        persist_token: bool = True,
+        warmup: bool = True,
     ):
         """
         Initialize ELM client.
@@ -36,17 +466,62 @@ class ELMClient:
             client_id: Application (client) ID (required for SP auth)
             client_secret: Client secret value (required for SP auth)
             interactive: Use interactive browser auth instead of SP
+            cache_ttl: Seconds to reuse cached lookups before revalidating
+                       (0 disables the on-disk cache)
+            persist_token: Reuse access tokens across runs via TOKEN_CACHE_FILE
+            warmup: Open the Dataverse connection (and, for SP auth, acquire a
+                    token) on a background thread while the caller sets up
         """
         self.tenant_id = tenant_id
         self.client_id = client_id
         self.client_secret = client_secret
         self.environment_url = environment_url.rstrip("/")
+        # Always ends with "/": endpoint paths are appended by concatenation
         self.api_url = f"{self.environment_url}/api/data/v9.2/"
         self.interactive = interactive
 
         # Dataverse requires the environment URL as the scope
         self._scope = [f"{self.environment_url}/.default"]
         self._token: Optional[dict] = None
+        self._token_expires = 0.0
+        self._auth_header = ""
+        self._token_lock = threading.Lock()
+        self._request_slots = threading.BoundedSemaphore(HTTP_MAX_CONCURRENCY)
+        # Worker pool for parallel_map(), created on first use
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._optionset_cache: dict[str, dict] = {}
+        self._org_info: Optional[dict] = None
+        # Found entity/attribute metadata keyed by (entity, attribute); the
+        # attribute is "" for the entity itself and "*" for its attribute names
+        self._meta_cache: dict[tuple[str, str], Any] = {}
+        # Metadata cache key -> monotonic time until which a 404 is trusted
+        self._metadata_misses: dict[str, float] = {}
+        self._cache = _DiskCache(self.environment_url, cache_ttl) if cache_ttl > 0 else None
+
+        # One pooled session so calls reuse TCP/TLS connections
+        self._session = requests.Session()
+        self._session.headers.update(_STATIC_HEADERS)
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_SIZE,
+            pool_maxsize=HTTP_POOL_SIZE,
+            max_retries=HTTP_RETRY,
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+        # msal (and cryptography/PyJWT behind it) is only needed once a client
+        # is built, so importing this module for constants or --help skips it
+        import msal
+
+        # MSAL token cache, loaded from disk so repeat runs skip the token endpoint
+        self._token_cache = msal.SerializableTokenCache()
+        self._token_cache_path = TOKEN_CACHE_FILE if persist_token else None
+        if self._token_cache_path:
+            try:
+                self._token_cache.deserialize(self._token_cache_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                pass
 
         if interactive:
             # Public client for interactive auth
@@ -58,6 +533,7 @@ class ELMClient:
             self._app = msal.PublicClientApplication(
                 client_id=client_id,
                 authority=f"https://login.microsoftonline.com/{tenant_id}",
+                token_cache=self._token_cache,
             )
         else:
             # Confidential client for service-to-service auth
@@ -67,59 +543,321 @@ class ELMClient:
                 client_id=client_id,
                 client_credential=client_secret,
                 authority=f"https://login.microsoftonline.com/{tenant_id}",
+                token_cache=self._token_cache,
             )
 
+        # DNS, TCP/TLS setup and token acquisition overlap with the caller's
+        # remaining setup instead of delaying the first request
+        self._warmup: Optional[threading.Thread] = None
+        if warmup:
+            self._warmup = threading.Thread(target=self._warm_up, name="elm-warmup", daemon=True)
+            self._warmup.start()
+
+    def _warm_up(self) -> None:
+        """
+        Open a pooled connection, then acquire a token (best-effort).
+
+        The connection comes first: if the first real call is already
+        waiting, it fetches the token itself while this thread finishes
+        the TLS handshake, and the token step here becomes a no-op.
+        """
+        try:
+            self._session.head(self.api_url, timeout=WARMUP_TIMEOUT)
+            # Interactive auth may prompt, so it waits for the first real call
+            if not self.interactive:
+                self._get_token()
+        except Exception as e:
+            logger.debug("Connection warm-up failed: %s", e)
+
+    def close(self) -> None:
+        """Close pooled HTTP connections and the worker pool."""
+        if self._pool:
+            self._pool.shutdown(wait=False)
+        self._session.close()
+
+    def parallel_map(self, fn: Callable[[Any], Any], items: Iterable[Any]) -> list:
+        """
+        Call fn on each item concurrently and return the results in order.
+
+        For independent calls that cannot share a $batch request. Runs on
+        one worker pool per client, reused across calls; the request slots
+        still cap in-flight requests at HTTP_MAX_CONCURRENCY. fn must not
+        call parallel_map itself.
+
+        Args:
+            fn: Function taking one item (typically wrapping client calls)
+            items: Items to process
+
+        Returns:
+            Results of fn, in item order. The first exception raised by
+            fn is re-raised.
+        """
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=HTTP_MAX_CONCURRENCY, thread_name_prefix="elm"
+                )
+        return list(self._pool.map(fn, items))
+
+    def clear_cache(self) -> None:
+        """
+        Discard this environment's cached lookups, on disk and in memory.
+
+        Everything in cache_dir is removed, including local deployment
+        state such as the schema fingerprint.
+        """
+        _DiskCache(self.environment_url, 0).clear()
+        self._meta_cache.clear()
+        self._optionset_cache.clear()
+        self._metadata_misses.clear()
+
+    @property
+    def cache_enabled(self) -> bool:
+        """Whether lookups and local deployment state may be reused (cache_ttl > 0)."""
+        return self._cache is not None
+
+    @property
+    def cache_dir(self) -> Path:
+        """Local state directory for this environment (exists even with cache_ttl=0)."""
+        return _cache_directory(self.environment_url)
+
+    def __enter__(self) -> "ELMClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
     def _get_token(self) -> str:
-        """Acquire access token with caching."""
-        # Try to get cached token first
-        accounts = self._app.get_accounts() if self.interactive else None
-        result = self._app.acquire_token_silent(
-            scopes=self._scope,
-            account=accounts[0] if accounts else None,
-        )
+        """
+        Acquire access token with caching.
 
-        if not result:
-            if self.interactive:
+        The token is reused in-process until TOKEN_REFRESH_MARGIN seconds
+        before it expires; only then is MSAL consulted again. Expiry is
+        tracked on the monotonic clock, so wall-clock adjustments cannot
+        extend a token's life.
+        """
+        if self._token and time.monotonic() < self._token_expires - TOKEN_REFRESH_MARGIN:
+            return self._token["access_token"]
+
+        # Serialize refreshes so concurrent callers don't each prompt or fetch
+        with self._token_lock:
+            if self._token and time.monotonic() < self._token_expires - TOKEN_REFRESH_MARGIN:
+                return self._token["access_token"]
+            return self._acquire_token()
+
+    def _acquire_token(self) -> str:
+        """Acquire a new access token from MSAL (caller holds _token_lock)."""
+        # expires_in counts from issue; timing from the request errs early
+        requested = time.monotonic()
+        if self.interactive:
+            # Try the cached account (refresh token) before prompting
+            accounts = self._app.get_accounts()
+            result = self._app.acquire_token_silent(
+                scopes=self._scope,
+                account=accounts[0] if accounts else None,
+            )
+            if not result:
                 # Interactive browser flow
                 result = self._app.acquire_token_interactive(scopes=self._scope)
-            else:
-                # Client credentials flow
-                result = self._app.acquire_token_for_client(scopes=self._scope)
+        else:
+            # Client credentials flow (MSAL serves unexpired tokens from its cache)
+            result = self._app.acquire_token_for_client(scopes=self._scope)
 
         if "access_token" not in result:
             error = result.get("error_description", result.get("error", "Unknown error"))
             raise RuntimeError(f"Failed to acquire token: {error}")
 
         self._token = result
+        self._auth_header = f"Bearer {result['access_token']}"
+        self._token_expires = requested + int(result.get("expires_in", 3600))
+        self._save_token_cache()
         return result["access_token"]
 
-    def _get_headers(self) -> dict:
-        """Get HTTP headers with authorization."""
-        token = self._get_token()
-        return {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-            "OData-MaxVersion": "4.0",
-            "OData-Version": "4.0",
-            "Accept": "application/json",
-            "Prefer": "odata.include-annotations=*",
-        }
+    def _save_token_cache(self) -> None:
+        """Write the MSAL token cache to disk if it changed (best-effort)."""
+        if not self._token_cache_path or not self._token_cache.has_state_changed:
+            return
+        try:
+            self._token_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._token_cache_path.with_suffix(".tmp")
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self._token_cache.serialize())
+            os.replace(tmp, self._token_cache_path)
+            self._token_cache.has_state_changed = False
+        except OSError:
+            pass
+
+    def _get_headers(self, annotations: bool = False) -> dict:
+        """
+        Get HTTP headers with authorization.
+
+        Responses use minimal OData metadata. Annotations (formatted values,
+        lookup names) are only requested when asked for, since they can
+        multiply the size of metadata and record responses.
+
+        The static OData headers are set once on the session, so only the
+        per-call ones are returned here; requests merges the two. A new dict
+        is returned because callers add or override per-request headers
+        (If-None-Match, Prefer, Accept) in it.
+
+        Args:
+            annotations: Request all OData annotations in the response
+        """
+        self._get_token()
+        if annotations:
+            return {"Authorization": self._auth_header, "Prefer": _ANNOTATIONS_PREFER}
+        return {"Authorization": self._auth_header}
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the pooled session, retrying transient failures.
+
+        At most HTTP_MAX_CONCURRENCY requests are in flight per client, each
+        with HTTP_TIMEOUT unless the caller passes a timeout. Throttled
+        responses (429/503) are retried for any method after the Retry-After
+        delay. Read timeouts and other transient 5xx/408 responses are
+        retried with exponential backoff and jitter for idempotent methods
+        only, so creates are never duplicated. Connection failures are
+        retried by the transport (HTTP_RETRY), not here. When
+        the service protection headers show the budget nearly spent, the
+        caller is paused briefly instead of running into a 429.
+
+        Returns:
+            The final response (callers still call _check_response)
+        """
+        # Let an in-flight warm-up finish so this request reuses its connection
+        warmup = self._warmup
+        if warmup is not None:
+            warmup.join(WARMUP_TIMEOUT)
+            self._warmup = None
+
+        kwargs.setdefault("timeout", HTTP_TIMEOUT)
+        idempotent = method in IDEMPOTENT_METHODS
+        for attempt in range(HTTP_MAX_RETRIES + 1):
+            try:
+                with self._request_slots:
+                    response = self._session.request(method, url, **kwargs)
+            except requests.ReadTimeout as e:
+                if not idempotent or attempt == HTTP_MAX_RETRIES:
+                    raise
+                delay = _retry_delay(attempt)
+                logger.warning("%s %s failed (%s); retrying in %.1fs", method, url, e, delay)
+                time.sleep(delay)
+                continue
+
+            status = response.status_code
+            retryable = status in THROTTLE_STATUSES or (
+                idempotent and status in TRANSIENT_STATUSES
+            )
+            if not retryable or attempt == HTTP_MAX_RETRIES:
+                if _near_rate_limit(response):
+                    logger.warning("Near Dataverse rate limit; pausing %.1fs", RATE_LIMIT_PAUSE)
+                    time.sleep(RATE_LIMIT_PAUSE)
+                return response
+            delay = _retry_delay(attempt, response)
+            logger.warning("%s %s returned %s; retrying in %.1fs", method, url, status, delay)
+            time.sleep(delay)
+        return response
+
+    def _url(self, path: str, params: Optional[dict] = None) -> str:
+        """
+        Build a Web API URL with its query string encoded once.
+
+        OData punctuation ($, commas, parentheses, quotes) is left readable;
+        callers pass the result without params= so requests does not
+        re-encode it on every attempt or page.
+        """
+        if not params:
+            return self.api_url + path
+        return f"{self.api_url}{path}?{urlencode(params, safe=_ODATA_SAFE)}"
+
+    def _invalidate(self, entity_set: str) -> None:
+        """Drop cached lookups for an entity set after a write."""
+        if self._cache:
+            self._cache.invalidate(f"{entity_set}_")
+
+    def _invalidate_metadata(self, entity_logical_name: str) -> None:
+        """Drop memoized and disk-cached metadata for an entity and its attributes."""
+        for key in [k for k in list(self._meta_cache) if k[0] == entity_logical_name]:
+            self._meta_cache.pop(key, None)
+        prefix = f"EntityDefinitions_{entity_logical_name}"
+        for key in [k for k in list(self._metadata_misses) if k.startswith(prefix)]:
+            self._metadata_misses.pop(key, None)
+        if self._cache:
+            self._cache.invalidate(f"EntityDefinitions_{entity_logical_name}")
+
+    def _get_metadata(self, cache_key: str, path: str) -> Optional[dict]:
+        """
+        GET a metadata definition, revalidating a disk-cached copy by ETag.
+
+        A cached copy is sent as If-None-Match, so an unchanged definition
+        comes back as 304 with no body. Not-found results are remembered for
+        METADATA_MISS_TTL seconds, so repeated existence checks during a
+        deployment do not each cost a round trip.
+
+        Args:
+            cache_key: Disk cache key, prefixed so writes invalidate it
+            path: Web API path relative to api_url
+
+        Returns:
+            Metadata, or None if not found
+        """
+        if self._metadata_misses.get(cache_key, 0.0) > time.monotonic():
+            return None
+
+        entry = self._cache.load(cache_key) if self._cache else None
+        headers = self._get_headers()
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+
+        response = self._request("GET", self.api_url + path, headers=headers)
+        if response.status_code == 404:
+            if entry:
+                self._cache.invalidate(cache_key)
+            self._metadata_misses[cache_key] = time.monotonic() + METADATA_MISS_TTL
+            return None
+        if response.status_code == 304 and entry:
+            return entry["value"]
+        _check_response(response)
+        metadata = _loads(response.content)
+        if self._cache:
+            etag = response.headers.get("ETag") or metadata.get("@odata.etag")
+            self._cache.store(cache_key, metadata, etag)
+        return metadata
+
+    def _cached(self, key: str, fetch: Callable[[], Any], ttl: Optional[int] = None) -> Any:
+        """
+        Return a disk-cached lookup result, calling fetch on a miss.
+
+        Args:
+            key: Cache key, prefixed with the entity set so writes invalidate it
+            fetch: Performs the lookup when there is no fresh entry
+            ttl: Override the client's cache TTL for this lookup
+        """
+        if not self._cache:
+            return fetch()
+        entry = self._cache.load(key)
+        if entry and self._cache.is_fresh(entry, ttl):
+            return entry["value"]
+        value = fetch()
+        self._cache.store(key, value)
+        return value
 
     def test_connection(self) -> dict:
         """
         Test connection to Dataverse.
 
+        The organization is fetched once per client; later calls return the
+        cached result without a round trip.
+
         Returns:
             Organization information if successful
         """
-        response = requests.get(
-            urljoin(self.api_url, "organizations"),
-            headers=self._get_headers(),
-            params={"$select": "organizationid,name"},
-        )
-        response.raise_for_status()
-        data = response.json()
-        return data.get("value", [{}])[0]
+        if self._org_info is None:
+            orgs = self.query("organizations", select=["organizationid", "name"], top=1)
+            self._org_info = orgs[0] if orgs else {}
+        return self._org_info
 
     def query(
         self,
@@ -140,7 +878,52 @@ class ELMClient:
             top: Maximum records to return
 
         Returns:
-            List of records
+            List of records (all pages)
+        """
+        return list(
+            self.iter_query(
+                entity_set, select=select, filter_expr=filter_expr, orderby=orderby, top=top
+            )
+        )
+
+    def iter_query(
+        self,
+        entity_set: str,
+        *,
+        select: Optional[list[str]] = None,
+        filter_expr: Optional[str] = None,
+        orderby: Optional[str] = None,
+        top: Optional[int] = None,
+        page_size: int = QUERY_PAGE_SIZE,
+        annotations: bool = False,
+        prefetch: bool = False,
+    ) -> Iterator[dict]:
+        """
+        Query Dataverse table using OData, yielding records page by page.
+
+        Pages of up to page_size rows are requested with
+        Prefer: odata.maxpagesize and followed via @odata.nextLink, so only
+        one page is held in memory and callers can start processing before
+        the last page arrives.
+
+        Each next link comes from the previous page, so pages cannot be
+        requested all at once. With prefetch, the next page is requested on
+        a background thread while the caller works through the current one
+        (at most two pages in memory); use it for long scans where
+        per-record work is significant, such as exports.
+
+        Args:
+            entity_set: Entity set name (e.g., "fsi_environmentrequests")
+            select: Columns to select
+            filter_expr: OData filter expression
+            orderby: Order by expression
+            top: Maximum records to return (not paged)
+            page_size: Maximum records per page
+            annotations: Include formatted value and lookup annotations
+            prefetch: Fetch the next page while the current one is consumed
+
+        Yields:
+            Records
         """
         params = {}
         if select:
@@ -149,16 +932,130 @@ class ELMClient:
             params["$filter"] = filter_expr
         if orderby:
             params["$orderby"] = orderby
+
         if top:
             params["$top"] = str(top)
 
-        response = requests.get(
-            urljoin(self.api_url, entity_set),
-            headers=self._get_headers(),
-            params=params,
+        yield from self._iter_pages(
+            self._url(entity_set, params),
+            paged=not top,
+            page_size=page_size,
+            annotations=annotations,
+            prefetch=prefetch,
+        )
+
+    def count(
+        self,
+        entity_set: str,
+        filter_expr: Optional[str] = None,
+        key: Optional[str] = None,
+    ) -> int:
+        """
+        Count the records matching a filter without downloading them.
+
+        Reads @odata.count from a one-record page. Dataverse stops counting
+        at ODATA_COUNT_LIMIT, so larger results are paged through (selecting
+        only key) and counted instead.
+
+        Args:
+            entity_set: Entity set name (e.g., "fsi_provisioninglogs")
+            filter_expr: OData filter expression
+            key: Column to select while counting (e.g., the primary key),
+                 keeping responses small
+
+        Returns:
+            Number of matching records
+        """
+        params = {"$count": "true"}
+        if key:
+            params["$select"] = key
+        if filter_expr:
+            params["$filter"] = filter_expr
+
+        headers = self._get_headers()
+        headers["Prefer"] = "odata.maxpagesize=1"
+        response = self._request("GET", self._url(entity_set, params), headers=headers)
+        _check_response(response)
+        page = _loads(response.content)
+        total = page.get("@odata.count")
+        if total is not None and total < ODATA_COUNT_LIMIT:
+            return total
+
+        records = self.iter_query(
+            entity_set, select=[key] if key else None, filter_expr=filter_expr
+        )
+        return sum(1 for _ in records)
+
+    def compile_query(
+        self,
+        entity_set: str,
+        select: Optional[list[str]] = None,
+        orderby: Optional[str] = None,
+    ) -> Callable[..., list[dict]]:
+        """
+        Prepare a query whose columns and ordering are fixed.
+
+        The entity set, $select and $orderby are encoded once; the returned
+        function only adds the per-call filter and top. Use it for lookups
+        repeated in a loop (e.g., one role lookup per role name).
+
+        Args:
+            entity_set: Entity set name (e.g., "roles")
+            select: Columns to select
+            orderby: Order by expression
+
+        Returns:
+            Function taking (filter_expr=None, top=None) and returning the
+            list of records (all pages)
+        """
+        base = {}
+        if select:
+            base["$select"] = ",".join(select)
+        if orderby:
+            base["$orderby"] = orderby
+        prefix = self._url(entity_set, base)
+        separator = "&" if base else "?"
+
+        def run(filter_expr: Optional[str] = None, top: Optional[int] = None) -> list[dict]:
+            params = {}
+            if filter_expr:
+                params["$filter"] = filter_expr
+            if top:
+                params["$top"] = str(top)
+            url = prefix
+            if params:
+                url = f"{prefix}{separator}{urlencode(params, safe=_ODATA_SAFE)}"
+            return list(self._iter_pages(url, paged=not top))
+
+        return run
+
+    def _iter_pages(
+        self,
+        url: str,
+        *,
+        paged: bool,
+        page_size: int = QUERY_PAGE_SIZE,
+        annotations: bool = False,
+        prefetch: bool = False,
+    ) -> Iterator[dict]:
+        """Yield records from a query URL, following @odata.nextLink."""
+
+        def fetch(page_url: str) -> dict:
+            # Headers are rebuilt per page: a slow consumer can outlive the token
+            headers = self._get_headers(annotations=annotations)
+            if paged:
+                prefer = [f"odata.maxpagesize={page_size}"]
+                if annotations:
+                    prefer.append(_ANNOTATIONS_PREFER)
+                headers["Prefer"] = ",".join(prefer)
+            response = self._request("GET", page_url, headers=headers)
+            _check_response(response)
+            return _loads(response.content)
+
+        # The next link is fully qualified and already carries the query options
+        yield from _paginate(
+            fetch, url, lambda _, page: page.get("@odata.nextLink"), prefetch
         )
-        response.raise_for_status()
-        return response.json().get("value", [])
 
     def query_fetchxml(self, entity_set: str, fetchxml: str) -> list[dict]:
         """
@@ -172,55 +1069,229 @@ class ELMClient:
             fetchxml: FetchXML query string
 
         Returns:
-            List of records
+            List of records, including formatted value and lookup annotations
         """
-        response = requests.get(
-            urljoin(self.api_url, entity_set),
-            headers=self._get_headers(),
-            params={"fetchXml": fetchxml},
+        response = self._request(
+            "GET",
+            f"{self.api_url}{entity_set}?fetchXml={_encode_fetchxml(fetchxml)}",
+            headers=self._get_headers(annotations=True),
         )
-        response.raise_for_status()
-        return response.json().get("value", [])
+        _check_response(response)
+        return _loads(response.content).get("value", [])
+
+    def iter_fetchxml(
+        self,
+        entity_set: str,
+        fetchxml: str,
+        *,
+        page_size: int = QUERY_PAGE_SIZE,
+        prefetch: bool = False,
+    ) -> Iterator[dict]:
+        """
+        Query Dataverse using FetchXML, yielding records page by page.
 
-    def create(self, entity_set: str, data: dict) -> str:
+        Records have the same shape as query_fetchxml() results (null-valued
+        columns are left out, formatted value and lookup annotations are
+        included), but every matching row is returned, not just the first
+        page. Each page is requested with the fetch element's page and count
+        attributes and the paging cookie returned with the previous page.
+
+        Args:
+            entity_set: Entity set name (e.g., "fsi_environmentrequests")
+            fetchxml: FetchXML query string without paging attributes
+            page_size: Maximum records per page
+            prefetch: Fetch the next page while the current one is consumed
+
+        Yields:
+            Records
+        """
+
+        def fetch(locator: tuple[int, Optional[str]]) -> dict:
+            number, cookie = locator
+            query = ElementTree.fromstring(fetchxml)
+            query.set("count", str(page_size))
+            query.set("page", str(number))
+            if cookie:
+                query.set("paging-cookie", cookie)
+            # Per-page queries are not reused, so bypass _encode_fetchxml's cache
+            encoded = quote_plus(ElementTree.tostring(query, encoding="unicode"))
+            response = self._request(
+                "GET",
+                f"{self.api_url}{entity_set}?fetchXml={encoded}",
+                headers=self._get_headers(annotations=True),
+            )
+            _check_response(response)
+            return _loads(response.content)
+
+        def next_of(
+            locator: tuple[int, Optional[str]], page: dict
+        ) -> Optional[tuple[int, Optional[str]]]:
+            if not page.get("@Microsoft.Dynamics.CRM.morerecords"):
+                return None
+            return locator[0] + 1, _fetchxml_paging_cookie(page)
+
+        yield from _paginate(fetch, (1, None), next_of, prefetch)
+
+    def create(
+        self,
+        entity_set: str,
+        data: Union[dict, bytes],
+        *,
+        return_representation: bool = False,
+    ) -> Union[str, tuple[str, dict]]:
         """
         Create a record in Dataverse.
 
         Args:
             entity_set: Entity set name
-            data: Record data
+            data: Record data, or pre-serialized UTF-8 JSON bytes
+            return_representation: Also return the created record, including
+                server-set columns (createdon, @odata.etag), from the create
+                response instead of a follow-up GET
 
         Returns:
-            Created record ID
+            Created record ID, or (ID, record) with return_representation
         """
-        response = requests.post(
-            urljoin(self.api_url, entity_set),
-            headers=self._get_headers(),
-            json=data,
+        headers = self._get_headers()
+        if return_representation:
+            headers["Prefer"] = RETURN_REPRESENTATION
+        response = self._request(
+            "POST",
+            self.api_url + entity_set,
+            headers=headers,
+            data=_dumps(data),
         )
-        response.raise_for_status()
+        _check_response(response)
+        self._invalidate(entity_set)
 
-        # Extract ID from OData-EntityId header
-        entity_id = response.headers.get("OData-EntityId", "")
-        if "(" in entity_id and ")" in entity_id:
-            return entity_id.split("(")[1].split(")")[0]
-        return ""
+        # Extract ID from OData-EntityId header (absent when the body is returned)
+        record_id = _record_id(response.headers.get("OData-EntityId", ""))
+        if not return_representation:
+            return record_id
+        record = _loads(response.content) if response.content else {}
+        return record_id or _record_id(record.get("@odata.id", "")), record
 
-    def update(self, entity_set: str, record_id: str, data: dict) -> None:
+    def update(
+        self,
+        entity_set: str,
+        record_id: str,
+        data: dict,
+        *,
+        if_match: Optional[str] = None,
+        if_none_match: Optional[str] = None,
+        return_representation: bool = False,
+    ) -> Union[Optional[str], dict]:
         """
         Update a record in Dataverse.
 
+        Pass the record's @odata.etag as if_match to update only if nobody
+        changed it since it was read, instead of re-reading it first.
+        if_match="*" updates only an existing record (no upsert create);
+        if_none_match="*" creates only (no update).
+
         Args:
             entity_set: Entity set name
             record_id: Record GUID
             data: Fields to update
+            if_match: Required ETag of the current record (or "*")
+            if_none_match: ETag the record must not match (or "*")
+            return_representation: Return the updated record instead of its ETag
+
+        Returns:
+            The record's new ETag, when Dataverse returns one, or the updated
+            record (including @odata.etag) with return_representation
+
+        Raises:
+            ConcurrencyError: The If-Match/If-None-Match condition failed (412)
         """
-        response = requests.patch(
-            urljoin(self.api_url, f"{entity_set}({record_id})"),
-            headers=self._get_headers(),
-            json=data,
+        headers = self._get_headers()
+        if if_match:
+            headers["If-Match"] = if_match
+        if if_none_match:
+            headers["If-None-Match"] = if_none_match
+        if return_representation:
+            headers["Prefer"] = RETURN_REPRESENTATION
+
+        response = self._request(
+            "PATCH",
+            self.api_url + f"{entity_set}({record_id})",
+            headers=headers,
+            data=_dumps(data),
         )
-        response.raise_for_status()
+        if response.status_code == 412:
+            raise ConcurrencyError(
+                f"{entity_set}({record_id}) was modified by another request; "
+                "re-read it and retry"
+            )
+        _check_response(response)
+        self._invalidate(entity_set)
+        if return_representation:
+            return _loads(response.content)
+        return response.headers.get("ETag")
+
+    def create_multiple(
+        self, entity_set: str, logical_name: str, records: list[dict]
+    ) -> list[str]:
+        """
+        Create records with the CreateMultiple message.
+
+        Records are sent in chunks of BULK_CHUNK_SIZE. Each chunk is
+        processed as one transaction: if any record fails, none in that
+        chunk are created and the error is raised. Use batch() when
+        records must succeed or fail independently.
+
+        Args:
+            entity_set: Entity set name (e.g., "fsi_provisioninglogs")
+            logical_name: Table logical name (e.g., "fsi_provisioninglog")
+            records: Record data
+
+        Returns:
+            Created record IDs, in input order
+        """
+        return self._bulk("CreateMultiple", entity_set, logical_name, records)
+
+    def update_multiple(
+        self, entity_set: str, logical_name: str, records: list[dict]
+    ) -> None:
+        """
+        Update records with the UpdateMultiple message.
+
+        Each record must include its primary key column. Chunking and
+        transaction behaviour are as for create_multiple().
+
+        Args:
+            entity_set: Entity set name
+            logical_name: Table logical name
+            records: Fields to update, including the primary key
+        """
+        self._bulk("UpdateMultiple", entity_set, logical_name, records)
+
+    def _bulk(
+        self, message: str, entity_set: str, logical_name: str, records: list[dict]
+    ) -> list[str]:
+        """Send records to a bound *Multiple message in chunks, returning any Ids."""
+        url = self.api_url + f"{entity_set}/Microsoft.Dynamics.CRM.{message}"
+        odata_type = f"Microsoft.Dynamics.CRM.{logical_name}"
+        ids = []
+        try:
+            for start in range(0, len(records), BULK_CHUNK_SIZE):
+                targets = [
+                    {"@odata.type": odata_type, **record}
+                    for record in records[start:start + BULK_CHUNK_SIZE]
+                ]
+                response = self._request(
+                    "POST",
+                    url,
+                    headers=self._get_headers(),
+                    data=_dumps({"Targets": targets}),
+                )
+                _check_response(response)
+                if response.content:
+                    ids.extend(_loads(response.content).get("Ids", []))
+        finally:
+            # Earlier chunks may have been written even if a later one failed
+            self._invalidate(entity_set)
+        return ids
 
     def get(self, entity_set: str, record_id: str, select: Optional[list[str]] = None) -> dict:
         """
@@ -238,13 +1309,62 @@ class ELMClient:
         if select:
             params["$select"] = ",".join(select)
 
-        response = requests.get(
-            urljoin(self.api_url, f"{entity_set}({record_id})"),
+        response = self._request(
+            "GET",
+            self._url(f"{entity_set}({record_id})", params),
             headers=self._get_headers(),
-            params=params,
         )
-        response.raise_for_status()
-        return response.json()
+        _check_response(response)
+        return _loads(response.content)
+
+    def batch(
+        self,
+        operations: list[tuple[str, str, Union[dict, bytes, None]]],
+        changeset: bool = False,
+    ) -> list[dict]:
+        """
+        Execute multiple operations in OData $batch requests.
+
+        Operations are sent in as few HTTP round trips as Dataverse allows
+        (up to BATCH_MAX_OPERATIONS per request).
+
+        Args:
+            operations: List of (method, relative_url, body) tuples,
+                        e.g. ("POST", "workflows", {...}). The body may be
+                        pre-serialized UTF-8 JSON bytes.
+            changeset: If True, wrap each request's operations in an atomic
+                       changeset (all succeed or all roll back). If False,
+                       operations are independent and processing continues
+                       past individual failures.
+
+        Returns:
+            List of {"status", "headers", "body"} dicts in operation order.
+            A failed changeset returns a single error entry for the request.
+        """
+        for method, url, _ in operations:
+            if method != "GET":
+                self._invalidate(url.split("(")[0].split("?")[0])
+
+        results = []
+        for start in range(0, len(operations), BATCH_MAX_OPERATIONS):
+            chunk = operations[start:start + BATCH_MAX_OPERATIONS]
+            boundary = f"batch_{uuid.uuid4()}"
+            headers = self._get_headers()
+            headers["Content-Type"] = f"multipart/mixed; boundary={boundary}"
+            if not changeset:
+                headers["Prefer"] = "odata.continue-on-error"
+
+            response = self._request(
+                "POST",
+                self.api_url + "$batch",
+                headers=headers,
+                data=_build_batch_body(self.api_url, chunk, boundary, changeset),
+            )
+            _check_response(response)
+            results.extend(
+                _parse_batch_response(response.headers.get("Content-Type", ""), response.text)
+            )
+        return results
 
     def query_audit(
         self,
@@ -252,34 +1372,34 @@ class ELMClient:
         operations: Optional[list[int]] = None,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-    ) -> list[dict]:
+    ) -> Iterator[dict]:
         """
         Query audit log for specific entity.
 
+        Records are streamed page by page; wrap in list() if all are needed
+        at once.
+
         Args:
             object_type_code: Entity type code or logical name
             operations: List of operation codes (1=Create, 2=Update, 3=Delete)
             start_date: ISO date string for start of range
             end_date: ISO date string for end of range
 
-        Returns:
-            List of audit records
+        Yields:
+            Audit records
         """
-        filters = [f"objecttypecode eq '{object_type_code}'"]
-
-        if operations:
-            op_filter = " or ".join([f"operation eq {op}" for op in operations])
-            filters.append(f"({op_filter})")
-
-        if start_date:
-            filters.append(f"createdon ge {start_date}")
-        if end_date:
-            filters.append(f"createdon le {end_date}")
-
-        return self.query(
+        op_filter = " or ".join(f"operation eq {op}" for op in operations or ())
+        filter_expr = _build_filter((
+            f"objecttypecode eq '{object_type_code}'",
+            op_filter and f"({op_filter})",
+            start_date and f"createdon ge {start_date}",
+            end_date and f"createdon le {end_date}",
+        ))
+
+        return self.iter_query(
             "audits",
             select=["auditid", "createdon", "_userid_value", "operation", "_objectid_value"],
-            filter_expr=" and ".join(filters),
+            filter_expr=filter_expr,
             orderby="createdon desc",
         )
 
@@ -291,25 +1411,27 @@ class ELMClient:
         """
         Get entity metadata by logical name.
 
+        Found entities are memoized for the lifetime of the client and
+        cached on disk with their ETag. Later runs revalidate with
+        If-None-Match, so unchanged metadata is not downloaded again.
+        A missing entity is remembered for METADATA_MISS_TTL seconds.
+
         Args:
             logical_name: Entity logical name (e.g., fsi_environmentrequest)
 
         Returns:
             Entity metadata dict or None if not found
         """
-        try:
-            response = requests.get(
-                urljoin(self.api_url, f"EntityDefinitions(LogicalName='{logical_name}')"),
-                headers=self._get_headers(),
-            )
-            if response.status_code == 404:
-                return None
-            response.raise_for_status()
-            return response.json()
-        except requests.HTTPError as e:
-            if e.response.status_code == 404:
-                return None
-            raise
+        if (logical_name, "") in self._meta_cache:
+            return self._meta_cache[(logical_name, "")]
+
+        metadata = self._get_metadata(
+            f"EntityDefinitions_{logical_name}",
+            f"EntityDefinitions(LogicalName='{logical_name}')",
+        )
+        if metadata is not None:
+            self._meta_cache[(logical_name, "")] = metadata
+        return metadata
 
     def create_entity(self, entity_metadata: dict) -> dict:
         """
@@ -321,49 +1443,118 @@ class ELMClient:
         Returns:
             Created entity metadata
         """
-        response = requests.post(
-            urljoin(self.api_url, "EntityDefinitions"),
-            headers=self._get_headers(),
-            json=entity_metadata,
+        headers = self._get_headers()
+        headers["Prefer"] = RETURN_REPRESENTATION
+        response = self._request(
+            "POST",
+            self.api_url + "EntityDefinitions",
+            headers=headers,
+            data=_dumps(entity_metadata),
         )
-        response.raise_for_status()
-
-        # Get the created entity
+        _check_response(response)
+        self._invalidate_metadata(entity_metadata.get("SchemaName", "").lower())
+        # A (re)created table gets new privilege IDs
+        self._invalidate("privileges")
+        if response.content:
+            return _loads(response.content)
+
+        # No representation returned: get the created entity
         entity_id = response.headers.get("OData-EntityId", "")
         if entity_id:
-            get_response = requests.get(entity_id, headers=self._get_headers())
+            get_response = self._request("GET", entity_id, headers=self._get_headers())
             if get_response.ok:
-                return get_response.json()
+                return _loads(get_response.content)
         return {"LogicalName": entity_metadata.get("SchemaName", "").lower()}
 
-    def create_attribute(self, entity_logical_name: str, attribute_metadata: dict) -> dict:
+    def create_attribute(
+        self, entity_logical_name: str, attribute_metadata: Union[dict, bytes]
+    ) -> Union[dict, bytes]:
         """
         Create a new attribute (column) on an entity.
 
         Args:
             entity_logical_name: Entity logical name
-            attribute_metadata: Attribute definition per Dataverse Web API spec
+            attribute_metadata: Attribute definition per Dataverse Web API spec,
+                                or pre-serialized JSON bytes
 
         Returns:
             Created attribute metadata
         """
-        response = requests.post(
-            urljoin(
-                self.api_url,
-                f"EntityDefinitions(LogicalName='{entity_logical_name}')/Attributes",
-            ),
+        response = self._request(
+            "POST",
+            self.api_url + f"EntityDefinitions(LogicalName='{entity_logical_name}')/Attributes",
             headers=self._get_headers(),
-            json=attribute_metadata,
+            data=_dumps(attribute_metadata),
         )
-        response.raise_for_status()
+        _check_response(response)
+        self._invalidate_metadata(entity_logical_name)
         return attribute_metadata
 
+    def batch_create_attributes(
+        self, entity_logical_name: str, attributes: list[Union[dict, bytes]]
+    ) -> list[dict]:
+        """
+        Create several attributes (columns) on an entity in one $batch request.
+
+        Operations are independent, so one failing column (e.g. 409 when it
+        already exists) does not prevent the others from being created.
+
+        Args:
+            entity_logical_name: Entity logical name
+            attributes: Attribute definitions per Dataverse Web API spec,
+                        or pre-serialized JSON bytes
+
+        Returns:
+            List of {"status", "headers", "body"} dicts, one per attribute
+        """
+        url = f"EntityDefinitions(LogicalName='{entity_logical_name}')/Attributes"
+        results = self.batch([("POST", url, attribute) for attribute in attributes])
+        self._invalidate_metadata(entity_logical_name)
+        return results
+
+    def list_attribute_logical_names(self, entity_logical_name: str) -> set[str]:
+        """
+        Get the logical names of all attributes on an entity in one request.
+
+        Requests only LogicalName with no OData metadata or annotations,
+        keeping the response small.
+
+        Args:
+            entity_logical_name: Entity logical name
+
+        Returns:
+            Set of attribute logical names (empty if the entity does not exist)
+        """
+        if (entity_logical_name, "*") in self._meta_cache:
+            return self._meta_cache[(entity_logical_name, "*")]
+
+        headers = self._get_headers()
+        headers["Accept"] = "application/json;odata.metadata=none"
+
+        response = self._request(
+            "GET",
+            self._url(
+                f"EntityDefinitions(LogicalName='{entity_logical_name}')/Attributes",
+                {"$select": "LogicalName"},
+            ),
+            headers=headers,
+        )
+        if response.status_code == 404:
+            return set()
+        _check_response(response)
+        names = {attr["LogicalName"] for attr in _loads(response.content).get("value", [])}
+        self._meta_cache[(entity_logical_name, "*")] = names
+        return names
+
     def get_attribute_metadata(
         self, entity_logical_name: str, attribute_logical_name: str
     ) -> Optional[dict]:
         """
         Get attribute metadata.
 
+        Found attributes are memoized for the lifetime of the client and
+        revalidated by ETag like get_entity_metadata().
+
         Args:
             entity_logical_name: Entity logical name
             attribute_logical_name: Attribute logical name
@@ -371,23 +1562,18 @@ class ELMClient:
         Returns:
             Attribute metadata or None if not found
         """
-        try:
-            response = requests.get(
-                urljoin(
-                    self.api_url,
-                    f"EntityDefinitions(LogicalName='{entity_logical_name}')"
-                    f"/Attributes(LogicalName='{attribute_logical_name}')",
-                ),
-                headers=self._get_headers(),
-            )
-            if response.status_code == 404:
-                return None
-            response.raise_for_status()
-            return response.json()
-        except requests.HTTPError as e:
-            if e.response.status_code == 404:
-                return None
-            raise
+        key = (entity_logical_name, attribute_logical_name)
+        if key in self._meta_cache:
+            return self._meta_cache[key]
+
+        metadata = self._get_metadata(
+            f"EntityDefinitions_{entity_logical_name}_{attribute_logical_name}",
+            f"EntityDefinitions(LogicalName='{entity_logical_name}')"
+            f"/Attributes(LogicalName='{attribute_logical_name}')",
+        )
+        if metadata is not None:
+            self._meta_cache[key] = metadata
+        return metadata
 
     def create_global_optionset(self, optionset_metadata: dict) -> dict:
         """
@@ -399,37 +1585,98 @@ class ELMClient:
         Returns:
             Created optionset metadata
         """
-        response = requests.post(
-            urljoin(self.api_url, "GlobalOptionSetDefinitions"),
+        response = self._request(
+            "POST",
+            self.api_url + "GlobalOptionSetDefinitions",
             headers=self._get_headers(),
-            json=optionset_metadata,
+            data=_dumps(optionset_metadata),
         )
-        response.raise_for_status()
+        _check_response(response)
+        self._optionset_cache[optionset_metadata["Name"]] = optionset_metadata
         return optionset_metadata
 
+    def batch_create_global_optionsets(self, definitions: list[dict]) -> list[dict]:
+        """
+        Create several global option sets in one $batch request.
+
+        Operations are independent; successfully created option sets are
+        memoized like create_global_optionset().
+
+        Args:
+            definitions: OptionSet definitions
+
+        Returns:
+            List of {"status", "headers", "body"} dicts, one per definition
+        """
+        results = self.batch(
+            [("POST", "GlobalOptionSetDefinitions", definition) for definition in definitions]
+        )
+        for definition, result in zip(definitions, results):
+            if 200 <= result["status"] < 300:
+                self._optionset_cache[definition["Name"]] = definition
+        return results
+
     def get_global_optionset(self, name: str) -> Optional[dict]:
         """
         Get global option set by name.
 
+        Found option sets (and ones created through this client) are
+        memoized for the lifetime of the client and revalidated by ETag
+        like get_entity_metadata().
+
         Args:
             name: OptionSet name
 
         Returns:
             OptionSet metadata or None if not found
         """
-        try:
-            response = requests.get(
-                urljoin(self.api_url, f"GlobalOptionSetDefinitions(Name='{name}')"),
-                headers=self._get_headers(),
-            )
-            if response.status_code == 404:
-                return None
-            response.raise_for_status()
-            return response.json()
-        except requests.HTTPError as e:
-            if e.response.status_code == 404:
-                return None
-            raise
+        if name in self._optionset_cache:
+            return self._optionset_cache[name]
+
+        optionset = self._get_metadata(
+            f"GlobalOptionSetDefinitions_{name}", f"GlobalOptionSetDefinitions(Name='{name}')"
+        )
+        if optionset is not None:
+            self._optionset_cache[name] = optionset
+        return optionset
+
+    def get_global_optionsets(self, names: list[str]) -> dict[str, Optional[dict]]:
+        """
+        Get several global option sets in one $batch request.
+
+        Memoized option sets and recent misses are served without a request;
+        the rest are fetched together and memoized like get_global_optionset().
+
+        Args:
+            names: OptionSet names
+
+        Returns:
+            Mapping of name to OptionSet metadata, or None if not found
+        """
+        found = {name: self._optionset_cache.get(name) for name in names}
+        now = time.monotonic()
+        missing = [
+            name
+            for name, optionset in found.items()
+            if optionset is None
+            and self._metadata_misses.get(f"GlobalOptionSetDefinitions_{name}", 0.0) <= now
+        ]
+        if not missing:
+            return found
+
+        results = self.batch(
+            [("GET", f"GlobalOptionSetDefinitions(Name='{name}')", None) for name in missing]
+        )
+        for name, result in zip(missing, results):
+            if result["status"] == 404:
+                self._metadata_misses[f"GlobalOptionSetDefinitions_{name}"] = (
+                    time.monotonic() + METADATA_MISS_TTL
+                )
+                continue
+            if not 200 <= result["status"] < 300:
+                raise RuntimeError(f"Failed to get option set {name}: {batch_error(result)}")
+            self._optionset_cache[name] = found[name] = result["body"]
+        return found
 
     def get_roles(self, filter_expr: Optional[str] = None) -> list[dict]:
         """
@@ -459,13 +1706,55 @@ class ELMClient:
         """
         Get system privileges.
 
+        Only name and privilegeid are selected. All pages are followed, so a
+        full listing (thousands of privileges) is not silently truncated.
+
         Args:
             filter_expr: OData filter expression
 
         Returns:
-            List of privileges
+            List of privileges ({"name", "privilegeid"})
+        """
+        return self.query(
+            "privileges", select=["name", "privilegeid"], filter_expr=filter_expr
+        )
+
+    def get_privilege_ids(
+        self, names: list[str], cache_ttl: Optional[int] = None
+    ) -> dict[str, str]:
         """
-        return self.query("privileges", filter_expr=filter_expr)
+        Look up privilege IDs by name with one filtered query.
+
+        A result that resolves every name is cached on disk (privilege IDs
+        do not change while an entity exists; create_entity() drops the
+        cached results, since a recreated table gets new IDs). Partial
+        results are never cached, so privileges for tables created later
+        are picked up.
+
+        Args:
+            names: Privilege names (e.g., prvCreatefsi_environmentrequest)
+            cache_ttl: Seconds a cached result may be reused (defaults to
+                       the client's cache_ttl)
+
+        Returns:
+            Privilege IDs keyed by name, for the names that exist
+        """
+        names = sorted(set(names))
+        digest = hashlib.sha256(",".join(names).encode("utf-8")).hexdigest()[:16]
+        cache_key = f"privileges_{digest}"
+        entry = self._cache.load(cache_key) if self._cache else None
+        if entry and self._cache.is_fresh(entry, cache_ttl):
+            return entry["value"]
+
+        rows = self.query(
+            "privileges",
+            select=["name", "privilegeid"],
+            filter_expr=" or ".join(f"name eq '{name}'" for name in names),
+        )
+        privilege_ids = {p["name"]: p["privilegeid"] for p in rows}
+        if self._cache and len(privilege_ids) == len(names):
+            self._cache.store(cache_key, privilege_ids)
+        return privilege_ids
 
     def add_role_privilege(self, role_id: str, privilege_id: str, depth: int) -> None:
         """
@@ -476,15 +1765,34 @@ class ELMClient:
             privilege_id: Privilege GUID
             depth: Privilege depth (1=User, 2=BU, 4=Parent:Child, 8=Org)
         """
-        response = requests.post(
-            urljoin(self.api_url, "AddPrivilegesRole"),
-            headers=self._get_headers(),
-            json={
-                "RoleId": role_id,
-                "Privileges": [{"PrivilegeId": privilege_id, "Depth": depth}],
-            },
-        )
-        response.raise_for_status()
+        self.add_role_privileges(role_id, [(privilege_id, depth)])
+
+    def add_role_privileges(self, role_id: str, privileges: list[tuple[str, int]]) -> None:
+        """
+        Add several privileges to a role with one AddPrivilegesRole call.
+
+        Requests carry at most BATCH_MAX_OPERATIONS privileges each; larger
+        lists are split into several calls.
+
+        Args:
+            role_id: Role GUID
+            privileges: (privilege GUID, depth) pairs
+        """
+        for start in range(0, len(privileges), BATCH_MAX_OPERATIONS):
+            chunk = privileges[start:start + BATCH_MAX_OPERATIONS]
+            response = self._request(
+                "POST",
+                self.api_url + "AddPrivilegesRole",
+                headers=self._get_headers(),
+                data=_dumps({
+                    "RoleId": role_id,
+                    "Privileges": [
+                        {"PrivilegeId": privilege_id, "Depth": depth}
+                        for privilege_id, depth in chunk
+                    ],
+                }),
+            )
+            _check_response(response)
 
     def get_role_privileges(self, role_id: str) -> list[dict]:
         """
@@ -501,6 +1809,26 @@ class ELMClient:
             select=["privilegeid", "name"],
         )
 
+    def role_has_privileges(self, role_id: str, names: list[str]) -> set[str]:
+        """
+        Check which of the named privileges are assigned to a role.
+
+        Filters server-side, so only matching privileges are returned.
+
+        Args:
+            role_id: Role GUID
+            names: Privilege names to check
+
+        Returns:
+            The subset of names assigned to the role
+        """
+        rows = self.query(
+            f"roles({role_id})/roleprivileges_association",
+            select=["name"],
+            filter_expr=" or ".join(f"name eq '{name}'" for name in names),
+        )
+        return {p["name"] for p in rows} & set(names)
+
     def create_saved_query(self, query_data: dict) -> str:
         """
         Create a saved query (view).
@@ -526,17 +1854,17 @@ class ELMClient:
         Returns:
             List of saved queries
         """
-        base_filter = f"returnedtypecode eq '{entity_logical_name}'"
-        if filter_expr:
-            base_filter = f"{base_filter} and {filter_expr}"
-        return self.query("savedqueries", filter_expr=base_filter)
+        return self.query(
+            "savedqueries",
+            filter_expr=_build_filter((f"returnedtypecode eq '{entity_logical_name}'", filter_expr)),
+        )
 
-    def create_workflow(self, workflow_data: dict) -> str:
+    def create_workflow(self, workflow_data: Union[dict, bytes]) -> str:
         """
         Create a workflow (business rule).
 
         Args:
-            workflow_data: Workflow definition
+            workflow_data: Workflow definition, or pre-serialized JSON bytes
 
         Returns:
             Created workflow ID
@@ -549,6 +1877,10 @@ class ELMClient:
         """
         Get workflows for an entity.
 
+        Results are cached on disk for cache_ttl seconds (TTL only:
+        Dataverse returns no ETag for collection queries to revalidate
+        with). Creating workflows through this client invalidates the cache.
+
         Args:
             entity_logical_name: Entity logical name
             category: Workflow category (2=Business Rule)
@@ -556,9 +1888,12 @@ class ELMClient:
         Returns:
             List of workflows
         """
-        return self.query(
-            "workflows",
-            filter_expr=f"primaryentity eq '{entity_logical_name}' and category eq {category}",
+        return self._cached(
+            f"workflows_{entity_logical_name}_{category}",
+            lambda: self.query(
+                "workflows",
+                filter_expr=f"primaryentity eq '{entity_logical_name}' and category eq {category}",
+            ),
         )
 
     def create_field_security_profile(self, profile_data: dict) -> str:
@@ -573,17 +1908,29 @@ class ELMClient:
         """
         return self.create("fieldsecurityprofiles", profile_data)
 
-    def get_field_security_profiles(self, filter_expr: Optional[str] = None) -> list[dict]:
+    def get_field_security_profiles(
+        self, filter_expr: Optional[str] = None, cache_ttl: Optional[int] = None
+    ) -> list[dict]:
         """
         Get field security profiles.
 
+        Results are cached on disk per filter. Creating a profile through
+        this client invalidates the cache.
+
         Args:
             filter_expr: OData filter expression
+            cache_ttl: Seconds a cached result may be reused (defaults to
+                       the client's cache_ttl)
 
         Returns:
             List of field security profiles
         """
-        return self.query("fieldsecurityprofiles", filter_expr=filter_expr)
+        digest = hashlib.sha256((filter_expr or "").encode("utf-8")).hexdigest()[:16]
+        return self._cached(
+            f"fieldsecurityprofiles_{digest}",
+            lambda: self.query("fieldsecurityprofiles", filter_expr=filter_expr),
+            cache_ttl,
+        )
 
     def create_field_permission(self, permission_data: dict) -> str:
         """
@@ -597,6 +1944,42 @@ class ELMClient:
         """
         return self.create("fieldpermissions", permission_data)
 
+    def get_field_permissions(self, profile_id: str) -> list[dict]:
+        """
+        Get field permissions configured on a field security profile.
+
+        Args:
+            profile_id: Field security profile GUID
+
+        Returns:
+            List of field permissions (entity, attribute and access levels)
+        """
+        return self.query(
+            "fieldpermissions",
+            select=["fieldpermissionid", "entityname", "attributelogicalname",
+                    "canread", "cancreate", "canupdate"],
+            filter_expr=f"_fieldsecurityprofileid_value eq {profile_id}",
+        )
+
+    def batch_create_field_permissions(
+        self, profile_id: str, entries: list[dict]
+    ) -> list[dict]:
+        """
+        Create field permissions for a profile in one $batch request.
+
+        Operations are independent, so an already-configured field (409/412)
+        does not prevent the others from being created.
+
+        Args:
+            profile_id: Field security profile GUID
+            entries: FieldPermission definitions without the profile binding
+
+        Returns:
+            List of {"status", "headers", "body"} dicts, one per entry
+        """
+        binding = {"fieldsecurityprofileid@odata.bind": f"/fieldsecurityprofiles({profile_id})"}
+        return self.batch([("POST", "fieldpermissions", {**entry, **binding}) for entry in entries])
+
     def get_solution_publisher(self, prefix: str) -> Optional[dict]:
         """
         Get solution publisher by prefix.
@@ -690,22 +2073,21 @@ def main():
             client_secret = getpass.getpass("Client secret: ")
 
     try:
-        client = ELMClient(
+        with ELMClient(
             tenant_id=args.tenant_id,
             environment_url=args.environment_url,
             client_id=args.client_id,
             client_secret=client_secret,
             interactive=args.interactive,
-        )
-
-        if args.test_connection:
-            print("Testing Dataverse connection...")
-            org = client.test_connection()
-            print(f"  Token acquired: ✓")
-            print(f"  API accessible: ✓")
-            print(f"  Organization: {org.get('name', 'Unknown')}")
-            print("\nConnection test: PASSED")
-            sys.exit(0)
+        ) as client:
+            if args.test_connection:
+                print("Testing Dataverse connection...")
+                org = client.test_connection()
+                print(f"  Token acquired: ✓")
+                print(f"  API accessible: ✓")
+                print(f"  Organization: {org.get('name', 'Unknown')}")
+                print("\nConnection test: PASSED")
+                sys.exit(0)
 
     except requests.HTTPError as e:
         print(f"HTTP Error: {e}", file=sys.stderr)
@@ -12,13 +12,65 @@ import os
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Union
 
 from elm_client import ELMClient
 
 
-def calculate_sha256(content: str) -> str:
-    """Calculate SHA-256 hash of content."""
-    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+# Exported tables: (file label, entity logical name, entity set, date field)
+EXPORT_TABLES = [
+    ("EnvironmentRequest", "fsi_environmentrequest", "fsi_environmentrequests", "fsi_requestedon"),
+    ("ProvisioningLog", "fsi_provisioninglog", "fsi_provisioninglogs", "fsi_timestamp"),
+]
+
+
+def calculate_sha256(content: Union[str, bytes]) -> str:
+    """
+    Calculate SHA-256 hash of content (UTF-8 encoded if str).
+
+    hashlib uses OpenSSL's SHA-256, which selects SHA-NI/ARMv8 SHA
+    instructions at runtime when the CPU has them.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def record_json(record: dict) -> bytes:
+    """
+    Serialize one record as 2-space indented JSON bytes.
+
+    Evidence files always use the stdlib json module (never an optional
+    accelerator), so the bytes and their SHA-256 are the same on every
+    install.
+    """
+    return json.dumps(record, indent=2, default=str).encode("utf-8")
+
+
+class HashingWriter:
+    """Binary file writer that SHA-256 hashes the bytes as they are written."""
+
+    def __init__(self, path: Path):
+        self._file = open(path, "wb")
+        self._hash = hashlib.sha256()
+
+    def write(self, data: bytes) -> None:
+        """Write data to the file and add it to the hash."""
+        self._file.write(data)
+        self._hash.update(data)
+
+    def hexdigest(self) -> str:
+        """SHA-256 of everything written so far."""
+        return self._hash.hexdigest()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "HashingWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
 
 def get_quarter(date: datetime) -> str:
@@ -33,10 +85,17 @@ def export_table(
     start_date: str,
     end_date: str,
     date_field: str,
+    output_file: Path,
     verbose: bool = False,
-) -> tuple[list[dict], int]:
+) -> tuple[int, str]:
     """
-    Export table records using FetchXML.
+    Export table records to a JSON file, streaming page by page.
+
+    Records are read with a paged FetchXML query and written and hashed as
+    they arrive, so memory stays flat regardless of how many rows fall in the
+    date range. FetchXML leaves out null-valued columns, so records keep the
+    shape of earlier exports; the file content matches
+    json.dumps(records, indent=2, default=str).
 
     Args:
         client: ELM client instance
@@ -45,10 +104,11 @@ def export_table(
         start_date: ISO date string (YYYY-MM-DD)
         end_date: ISO date string (YYYY-MM-DD)
         date_field: Field to filter by date
+        output_file: JSON file to write
         verbose: Show detailed output
 
     Returns:
-        Tuple of (records, count)
+        Tuple of (count, SHA-256 hex digest of the file content)
     """
     # FetchXML for date range query
     fetchxml = f"""
@@ -67,12 +127,21 @@ def export_table(
     if verbose:
         print(f"  Querying {entity_name} from {start_date} to {end_date}...")
 
-    records = client.query_fetchxml(entity_set, fetchxml)
+    # The next page downloads while this one is serialized and hashed
+    records = client.iter_fetchxml(entity_set, fetchxml, prefetch=True)
+
+    count = 0
+    with HashingWriter(output_file) as out:
+        for record in records:
+            out.write(b"[\n  " if count == 0 else b",\n  ")
+            out.write(record_json(record).replace(b"\n", b"\n  "))
+            count += 1
+        out.write(b"\n]" if count else b"[]")
 
     if verbose:
-        print(f"  Retrieved {len(records)} records")
+        print(f"  Retrieved {count} records")
 
-    return records, len(records)
+    return count, out.hexdigest()
 
 
 def main():
@@ -172,129 +241,108 @@ Examples:
 
     try:
         # Initialize client
-        client = ELMClient(
+        with ELMClient(
             tenant_id=args.tenant_id,
             client_id=args.client_id,
             client_secret=client_secret,
             environment_url=args.environment_url,
-        )
-
-        # Create output directory
-        output_path = Path(args.output_path)
-        output_path.mkdir(parents=True, exist_ok=True)
-
-        manifest = {
-            "exportDate": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
-            "exportedBy": "export_quarterly_evidence.py",
-            "environmentUrl": args.environment_url,
-            "dateRange": {
-                "start": args.start_date,
-                "end": args.end_date,
-            },
-            "files": [],
-        }
-
-        # Export EnvironmentRequest
-        print("Exporting EnvironmentRequest...")
-        requests_data, requests_count = export_table(
-            client,
-            entity_name="fsi_environmentrequest",
-            entity_set="fsi_environmentrequests",
-            start_date=args.start_date,
-            end_date=args.end_date,
-            date_field="fsi_requestedon",
-            verbose=args.verbose,
-        )
-
-        requests_filename = f"EnvironmentRequest-{year}-{quarter}.json"
-        requests_content = json.dumps(requests_data, indent=2, default=str)
-        requests_hash = calculate_sha256(requests_content)
-
-        (output_path / requests_filename).write_text(requests_content)
-        print(f"  Exported {requests_count} records to {requests_filename}")
-        print(f"  SHA-256: {requests_hash[:16]}...")
-
-        if requests_count == 0:
-            print("  WARNING: No EnvironmentRequest records found in date range")
-
-        manifest["files"].append({
-            "name": requests_filename,
-            "table": "fsi_environmentrequest",
-            "recordCount": requests_count,
-            "sha256": requests_hash,
-            "isEmpty": requests_count == 0,
-        })
-
-        # Export ProvisioningLog
-        print()
-        print("Exporting ProvisioningLog...")
-        logs_data, logs_count = export_table(
-            client,
-            entity_name="fsi_provisioninglog",
-            entity_set="fsi_provisioninglogs",
-            start_date=args.start_date,
-            end_date=args.end_date,
-            date_field="fsi_timestamp",
-            verbose=args.verbose,
-        )
-
-        logs_filename = f"ProvisioningLog-{year}-{quarter}.json"
-        logs_content = json.dumps(logs_data, indent=2, default=str)
-        logs_hash = calculate_sha256(logs_content)
-
-        (output_path / logs_filename).write_text(logs_content)
-        print(f"  Exported {logs_count} records to {logs_filename}")
-        print(f"  SHA-256: {logs_hash[:16]}...")
-
-        if logs_count == 0:
-            print("  WARNING: No ProvisioningLog records found in date range")
-
-        manifest["files"].append({
-            "name": logs_filename,
-            "table": "fsi_provisioninglog",
-            "recordCount": logs_count,
-            "sha256": logs_hash,
-            "isEmpty": logs_count == 0,
-        })
-
-        # Write manifest
-        print()
-        print("Writing manifest...")
-        manifest_content = json.dumps(manifest, indent=2)
-        manifest_hash = calculate_sha256(manifest_content)
-        manifest["manifestHash"] = manifest_hash
-
-        manifest_path = output_path / "manifest.json"
-        manifest_path.write_text(json.dumps(manifest, indent=2))
-        print(f"  Manifest: {manifest_path}")
-
-        # Summary
-        print()
-        print("Export Complete")
-        print("=" * 15)
-        print(f"Output directory: {output_path}")
-        print(f"Total records: {requests_count + logs_count}")
-        print()
-        print("Files created:")
-        for f in manifest["files"]:
-            print(f"  - {f['name']} ({f['recordCount']} records)")
-        print(f"  - manifest.json")
-
-        # Warn if both exports are empty
-        if requests_count == 0 and logs_count == 0:
+        ) as client:
+            # Create output directory
+            output_path = Path(args.output_path)
+            output_path.mkdir(parents=True, exist_ok=True)
+
+            manifest = {
+                "exportDate": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+                "exportedBy": "export_quarterly_evidence.py",
+                "environmentUrl": args.environment_url,
+                "dateRange": {
+                    "start": args.start_date,
+                    "end": args.end_date,
+                },
+                "files": [],
+            }
+
+            # The tables are independent: export them concurrently, then
+            # report them in order
+            print("Exporting " + " and ".join(label for label, *_ in EXPORT_TABLES) + "...")
+
+            def export(table: tuple[str, str, str, str]) -> tuple[int, str]:
+                label, entity_name, entity_set, date_field = table
+                return export_table(
+                    client,
+                    entity_name=entity_name,
+                    entity_set=entity_set,
+                    start_date=args.start_date,
+                    end_date=args.end_date,
+                    date_field=date_field,
+                    output_file=output_path / f"{label}-{year}-{quarter}.json",
+                    verbose=args.verbose,
+                )
+
+            results = client.parallel_map(export, EXPORT_TABLES)
+
+            for (label, entity_name, _, _), (count, file_hash) in zip(EXPORT_TABLES, results):
+                filename = f"{label}-{year}-{quarter}.json"
+                print()
+                print(f"{label}:")
+                print(f"  Exported {count} records to {filename}")
+                print(f"  SHA-256: {file_hash[:16]}...")
+
+                if count == 0:
+                    print(f"  WARNING: No {label} records found in date range")
+
+                manifest["files"].append({
+                    "name": filename,
+                    "table": entity_name,
+                    "recordCount": count,
+                    "sha256": file_hash,
+                    "isEmpty": count == 0,
+                })
+
+            total_count = sum(f["recordCount"] for f in manifest["files"])
+
+            # Write manifest
+            print()
+            print("Writing manifest...")
+            # manifestHash covers the manifest serialized without it: serialize
+            # once, hash, then splice the hash in as the last key ("\n}" ends
+            # the indented JSON object)
+            manifest_content = json.dumps(manifest, indent=2)
+            manifest_hash = calculate_sha256(manifest_content)
+
+            manifest_path = output_path / "manifest.json"
+            manifest_path.write_text(
+                f'{manifest_content[:-2]},\n  "manifestHash": "{manifest_hash}"\n}}'
+            )
+            print(f"  Manifest: {manifest_path}")
+
+            # Summary
+            print()
+            print("Export Complete")
+            print("=" * 15)
+            print(f"Output directory: {output_path}")
+            print(f"Total records: {total_count}")
             print()
-            print("NOTICE: Both exports contain 0 records.")
-            print("  This may indicate:")
-            print("  - No activity in the specified date range")
-            print("  - Incorrect date range parameters")
-            print("  - ELM tables not yet populated")
-
-        print()
-        print("Integrity verification:")
-        print("  To verify exports, compare SHA-256 hashes in manifest.json")
-        print("  with recalculated hashes of the exported files.")
-
-        sys.exit(0)
+            print("Files created:")
+            for f in manifest["files"]:
+                print(f"  - {f['name']} ({f['recordCount']} records)")
+            print(f"  - manifest.json")
+
+            # Warn if both exports are empty
+            if total_count == 0:
+                print()
+                print("NOTICE: Both exports contain 0 records.")
+                print("  This may indicate:")
+                print("  - No activity in the specified date range")
+                print("  - Incorrect date range parameters")
+                print("  - ELM tables not yet populated")
+
+            print()
+            print("Integrity verification:")
+            print("  To verify exports, compare SHA-256 hashes in manifest.json")
+            print("  with recalculated hashes of the exported files.")
+
+            sys.exit(0)
 
     except Exception as e:
         print(f"\nError: {e}", file=sys.stderr)
@@ -14,19 +14,50 @@ try:
     from azure.identity import DefaultAzureCredential, InteractiveBrowserCredential
     from azure.keyvault.secrets import SecretClient
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except ImportError:
     print("Missing dependencies. Run: pip install -r requirements.txt", file=sys.stderr)
     sys.exit(4)
 
 
+GRAPH_URL = "https://graph.microsoft.com/v1.0"
+
+# Connection failures are retried for every call; throttling and transient
+# 5xx responses only for GETs, so app and secret creation are never repeated
+GRAPH_RETRY = Retry(
+    total=3,
+    backoff_factor=0.3,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["GET"],
+    raise_on_status=False,
+)
+
+
 def get_graph_token(credential) -> str:
     """Get access token for Microsoft Graph."""
     token = credential.get_token("https://graph.microsoft.com/.default")
     return token.token
 
 
+def create_graph_session(token: str) -> requests.Session:
+    """
+    Create a pooled Graph API session authorized with token.
+
+    All Graph calls in a run share its TLS connection instead of each
+    opening a new one.
+    """
+    session = requests.Session()
+    session.headers.update({
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json",
+    })
+    session.mount("https://", HTTPAdapter(pool_maxsize=4, max_retries=GRAPH_RETRY))
+    return session
+
+
 def create_app_registration(
-    token: str,
+    session: requests.Session,
     app_name: str,
     tenant_id: str,
     dry_run: bool = False,
@@ -35,7 +66,7 @@ def create_app_registration(
     Create Entra ID app registration.
 
     Args:
-        token: Graph API access token
+        session: Graph API session (see create_graph_session)
         app_name: Display name for the application
         tenant_id: Tenant ID
         dry_run: If True, don't create, just validate
@@ -43,15 +74,9 @@ def create_app_registration(
     Returns:
         Application details including appId and id
     """
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json",
-    }
-
     # Check if app already exists
-    search_response = requests.get(
-        "https://graph.microsoft.com/v1.0/applications",
-        headers=headers,
+    search_response = session.get(
+        f"{GRAPH_URL}/applications",
         params={"$filter": f"displayName eq '{app_name}'"},
     )
     search_response.raise_for_status()
@@ -73,11 +98,7 @@ def create_app_registration(
         "requiredResourceAccess": [],  # No Graph permissions needed
     }
 
-    response = requests.post(
-        "https://graph.microsoft.com/v1.0/applications",
-        headers=headers,
-        json=app_data,
-    )
+    response = session.post(f"{GRAPH_URL}/applications", json=app_data)
     response.raise_for_status()
     app = response.json()
 
@@ -88,7 +109,7 @@ def create_app_registration(
 
 
 def create_client_secret(
-    token: str,
+    session: requests.Session,
     app_object_id: str,
     expiry_days: int,
     dry_run: bool = False,
@@ -97,7 +118,7 @@ def create_client_secret(
     Create client secret for application.
 
     Args:
-        token: Graph API access token
+        session: Graph API session (see create_graph_session)
         app_object_id: Application object ID (not appId)
         expiry_days: Days until secret expires
         dry_run: If True, don't create
@@ -109,11 +130,6 @@ def create_client_secret(
         print(f"  [DRY RUN] Would create secret with {expiry_days}-day expiry")
         return {"secretText": "dry-run-secret", "keyId": "dry-run-key-id"}
 
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json",
-    }
-
     end_date = (datetime.now(timezone.utc) + timedelta(days=expiry_days)).isoformat().replace("+00:00", "Z")
 
     secret_data = {
@@ -123,9 +139,8 @@ def create_client_secret(
         }
     }
 
-    response = requests.post(
-        f"https://graph.microsoft.com/v1.0/applications/{app_object_id}/addPassword",
-        headers=headers,
+    response = session.post(
+        f"{GRAPH_URL}/applications/{app_object_id}/addPassword",
         json=secret_data,
     )
     response.raise_for_status()
@@ -261,12 +276,13 @@ Examples:
         else:
             credential = DefaultAzureCredential()
 
-        token = get_graph_token(credential)
+        # One token and one pooled session for every Graph call in this run
+        session = create_graph_session(get_graph_token(credential))
 
         # Step 1: Create or find app registration
         print("[1/4] Creating Entra ID application...")
         app = create_app_registration(
-            token=token,
+            session=session,
             app_name=args.app_name,
             tenant_id=args.tenant_id,
             dry_run=args.dry_run,
@@ -276,7 +292,7 @@ Examples:
         # Step 2: Create client secret
         print("[2/4] Creating client secret...")
         secret = create_client_secret(
-            token=token,
+            session=session,
             app_object_id=app["id"],
             expiry_days=args.expiry_days,
             dry_run=args.dry_run,
@@ -10,9 +10,28 @@ import argparse
 import os
 import sys
 from datetime import datetime, timedelta, timezone
+from typing import Iterable
 
 from elm_client import ELMClient
 
+# Audit records kept for reporting; the rest are only counted
+AUDIT_SAMPLE_SIZE = 10
+
+
+def _count_and_sample_by_operation(
+    records: Iterable[dict], operations: Iterable[int], limit: int = AUDIT_SAMPLE_SIZE
+) -> dict[int, tuple[int, list[dict]]]:
+    """Split an audit record stream by operation into (count, first `limit` records)."""
+    counts = dict.fromkeys(operations, 0)
+    samples: dict[int, list[dict]] = {op: [] for op in counts}
+    for record in records:
+        op = record.get("operation")
+        if op in counts:
+            counts[op] += 1
+            if counts[op] <= limit:
+                samples[op].append(record)
+    return {op: (counts[op], samples[op]) for op in counts}
+
 
 def main():
     """CLI entry point."""
@@ -97,173 +116,168 @@ Examples:
     print(f"Date range: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
 
     try:
-        client = ELMClient(
+        with ELMClient(
             tenant_id=args.tenant_id,
             client_id=args.client_id,
             client_secret=client_secret,
             environment_url=args.environment_url,
-        )
-
-        # Count total records in range
-        logs = client.query(
-            "fsi_provisioninglogs",
-            select=["fsi_provisioninglogid"],
-            filter_expr=(
+        ) as client:
+            in_range = (
                 f"fsi_timestamp ge {start_date.isoformat()}Z and "
                 f"fsi_timestamp le {end_date.isoformat()}Z"
-            ),
-        )
-        record_count = len(logs)
-        print(f"Records checked: {record_count}")
-        print()
-
-        # Check audit log for modification attempts
-        print("Audit Log Analysis:")
-
-        # Query for Update operations (2)
-        update_attempts = client.query_audit(
-            "fsi_provisioninglog",
-            operations=[2],  # Update
-            start_date=start_date.isoformat() + "Z",
-            end_date=end_date.isoformat() + "Z",
-        )
-
-        # Query for Delete operations (3)
-        delete_attempts = client.query_audit(
-            "fsi_provisioninglog",
-            operations=[3],  # Delete
-            start_date=start_date.isoformat() + "Z",
-            end_date=end_date.isoformat() + "Z",
-        )
-
-        violations_found = False
-
-        if update_attempts:
-            violations_found = True
-            print(f"  Update attempts: {len(update_attempts)} ✗")
-            if args.verbose:
-                for attempt in update_attempts[:10]:  # Show first 10
-                    print(
-                        f"    - {attempt.get('createdon')} by "
-                        f"{attempt.get('_userid_value', 'Unknown')} "
-                        f"(record: {attempt.get('_objectid_value', 'Unknown')[:8]}...)"
-                    )
-                if len(update_attempts) > 10:
-                    print(f"    ... and {len(update_attempts) - 10} more")
-        else:
-            print("  Update attempts: 0 ✓")
-
-        if delete_attempts:
-            violations_found = True
-            print(f"  Delete attempts: {len(delete_attempts)} ✗")
-            if args.verbose:
-                for attempt in delete_attempts[:10]:
-                    print(
-                        f"    - {attempt.get('createdon')} by "
-                        f"{attempt.get('_userid_value', 'Unknown')} "
-                        f"(record: {attempt.get('_objectid_value', 'Unknown')[:8]}...)"
-                    )
-                if len(delete_attempts) > 10:
-                    print(f"    ... and {len(delete_attempts) - 10} more")
-        else:
-            print("  Delete attempts: 0 ✓")
-
-        print()
-
-        # Data integrity checks
-        print("Data Integrity:")
-
-        # Check for records with missing required fields
-        missing_fields_query = (
-            f"fsi_timestamp ge {start_date.isoformat()}Z and "
-            f"fsi_timestamp le {end_date.isoformat()}Z and "
-            "(fsi_action eq null or fsi_actor eq null or fsi_success eq null)"
-        )
-
-        incomplete_records = client.query(
-            "fsi_provisioninglogs",
-            select=["fsi_provisioninglogid", "fsi_action", "fsi_actor", "fsi_success"],
-            filter_expr=missing_fields_query,
-        )
-
-        if incomplete_records:
-            print(f"  Records with missing fields: {len(incomplete_records)} ✗")
-            if args.verbose:
-                for rec in incomplete_records[:5]:
-                    print(f"    - {rec.get('fsi_provisioninglogid', 'Unknown')[:8]}...")
-        else:
-            print("  Records with missing fields: 0 ✓")
-
-        # Check for orphaned records (no parent request)
-        orphan_query = (
-            f"fsi_timestamp ge {start_date.isoformat()}Z and "
-            f"fsi_timestamp le {end_date.isoformat()}Z and "
-            "_fsi_environmentrequest_value eq null"
-        )
-
-        orphaned_records = client.query(
-            "fsi_provisioninglogs",
-            select=["fsi_provisioninglogid"],
-            filter_expr=orphan_query,
-        )
-
-        if orphaned_records:
-            print(f"  Orphaned records: {len(orphaned_records)} ✗")
-        else:
-            print("  Orphaned records: 0 ✓")
-
-        print()
-
-        # Summary
-        integrity_issues = len(incomplete_records) + len(orphaned_records)
-
-        if violations_found:
-            print("ALERT: Immutability violations detected!")
-            print()
-            if update_attempts:
-                print(f"Update attempts: {len(update_attempts)}")
-                for attempt in update_attempts[:5]:
-                    print(
-                        f"  - {attempt.get('createdon')} by "
-                        f"{attempt.get('_userid_value', 'Unknown')}"
-                    )
-            if delete_attempts:
-                print(f"Delete attempts: {len(delete_attempts)}")
-                for attempt in delete_attempts[:5]:
-                    print(
-                        f"  - {attempt.get('createdon')} by "
-                        f"{attempt.get('_userid_value', 'Unknown')}"
-                    )
-            print()
-            print("Result: FAILED - Investigate immediately")
+            )
+            audit_range = {
+                "start_date": start_date.isoformat() + "Z",
+                "end_date": end_date.isoformat() + "Z",
+            }
+
+            # Records with missing required fields
+            incomplete_filter = (
+                f"{in_range} and "
+                "(fsi_action eq null or fsi_actor eq null or fsi_success eq null)"
+            )
+            key = "fsi_provisioninglogid"
+
+            # All checks are independent reads, so run them on the client's pool
+            checks = [
+                # Record counts come from @odata.count; no records are downloaded
+                lambda: client.count("fsi_provisioninglogs", in_range, key),
+                # Audit log: Update (2) and Delete (3) operations, read in one
+                # query and split by operation. Audit pages are streamed and
+                # counted in the worker, keeping only a sample of each
+                lambda: _count_and_sample_by_operation(
+                    client.query_audit("fsi_provisioninglog", operations=[2, 3], **audit_range),
+                    (2, 3),
+                ),
+                lambda: client.count("fsi_provisioninglogs", incomplete_filter, key),
+                # Orphaned records (no parent request)
+                lambda: client.count(
+                    "fsi_provisioninglogs",
+                    f"{in_range} and _fsi_environmentrequest_value eq null",
+                    key,
+                ),
+            ]
+            record_count, audit, incomplete_count, orphaned_count = client.parallel_map(
+                lambda check: check(), checks
+            )
+
+            print(f"Records checked: {record_count}")
             print()
-            print("Recommended actions:")
-            print("  1. Review security role assignments")
-            print("  2. Check for System Administrator overrides")
-            print("  3. Document incident per security policy")
-            print("  4. Contact security team if unauthorized")
-            sys.exit(3)  # Exit code 3 = immutability violations (updates/deletes detected)
-
-        elif integrity_issues > 0:
-            print("WARNING: Data integrity issues found")
-            print()
-            print(f"Result: PARTIAL - {integrity_issues} integrity issue(s)")
+
+            # Check audit log for modification attempts
+            print("Audit Log Analysis:")
+
+            update_count, update_attempts = audit[2]
+            delete_count, delete_attempts = audit[3]
+
+            violations_found = False
+
+            if update_count:
+                violations_found = True
+                print(f"  Update attempts: {update_count} ✗")
+                if args.verbose:
+                    for attempt in update_attempts[:10]:  # Show first 10
+                        print(
+                            f"    - {attempt.get('createdon')} by "
+                            f"{attempt.get('_userid_value', 'Unknown')} "
+                            f"(record: {attempt.get('_objectid_value', 'Unknown')[:8]}...)"
+                        )
+                    if update_count > 10:
+                        print(f"    ... and {update_count - 10} more")
+            else:
+                print("  Update attempts: 0 ✓")
+
+            if delete_count:
+                violations_found = True
+                print(f"  Delete attempts: {delete_count} ✗")
+                if args.verbose:
+                    for attempt in delete_attempts[:10]:
+                        print(
+                            f"    - {attempt.get('createdon')} by "
+                            f"{attempt.get('_userid_value', 'Unknown')} "
+                            f"(record: {attempt.get('_objectid_value', 'Unknown')[:8]}...)"
+                        )
+                    if delete_count > 10:
+                        print(f"    ... and {delete_count - 10} more")
+            else:
+                print("  Delete attempts: 0 ✓")
+
             print()
-            print("Recommended actions:")
-            print("  1. Review records with missing fields")
-            print("  2. Investigate orphaned log entries")
-            print("  3. Fix data issues if possible")
-            sys.exit(2)  # Exit code 2 = integrity issues, 3 = violations
-
-        else:
-            print("Result: PASSED - No immutability violations detected")
+
+            # Data integrity checks
+            print("Data Integrity:")
+
+            if incomplete_count:
+                print(f"  Records with missing fields: {incomplete_count} ✗")
+                if args.verbose:
+                    # Only the sample shown is fetched
+                    for rec in client.query(
+                        "fsi_provisioninglogs",
+                        select=["fsi_provisioninglogid"],
+                        filter_expr=incomplete_filter,
+                        top=5,
+                    ):
+                        print(f"    - {rec.get('fsi_provisioninglogid', 'Unknown')[:8]}...")
+            else:
+                print("  Records with missing fields: 0 ✓")
+
+            if orphaned_count:
+                print(f"  Orphaned records: {orphaned_count} ✗")
+            else:
+                print("  Orphaned records: 0 ✓")
+
             print()
-            print("Summary:")
-            print(f"  - Records validated: {record_count}")
-            print("  - Update attempts: 0")
-            print("  - Delete attempts: 0")
-            print("  - Data integrity: OK")
-            sys.exit(0)
+
+            # Summary
+            integrity_issues = incomplete_count + orphaned_count
+
+            if violations_found:
+                print("ALERT: Immutability violations detected!")
+                print()
+                if update_count:
+                    print(f"Update attempts: {update_count}")
+                    for attempt in update_attempts[:5]:
+                        print(
+                            f"  - {attempt.get('createdon')} by "
+                            f"{attempt.get('_userid_value', 'Unknown')}"
+                        )
+                if delete_count:
+                    print(f"Delete attempts: {delete_count}")
+                    for attempt in delete_attempts[:5]:
+                        print(
+                            f"  - {attempt.get('createdon')} by "
+                            f"{attempt.get('_userid_value', 'Unknown')}"
+                        )
+                print()
+                print("Result: FAILED - Investigate immediately")
+                print()
+                print("Recommended actions:")
+                print("  1. Review security role assignments")
+                print("  2. Check for System Administrator overrides")
+                print("  3. Document incident per security policy")
+                print("  4. Contact security team if unauthorized")
+                sys.exit(3)  # Exit code 3 = immutability violations (updates/deletes detected)
+
+            elif integrity_issues > 0:
+                print("WARNING: Data integrity issues found")
+                print()
+                print(f"Result: PARTIAL - {integrity_issues} integrity issue(s)")
+                print()
+                print("Recommended actions:")
+                print("  1. Review records with missing fields")
+                print("  2. Investigate orphaned log entries")
+                print("  3. Fix data issues if possible")
+                sys.exit(2)  # Exit code 2 = integrity issues, 3 = violations
+
+            else:
+                print("Result: PASSED - No immutability violations detected")
+                print()
+                print("Summary:")
+                print(f"  - Records validated: {record_count}")
+                print("  - Update attempts: 0")
+                print("  - Delete attempts: 0")
+                print("  - Data integrity: OK")
+                sys.exit(0)
 
     except Exception as e:
         print(f"\nError: {e}", file=sys.stderr)
@@ -11,7 +11,7 @@ import json
 import os
 import sys
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Callable, Optional
 
 from elm_client import ELMClient
 
@@ -100,24 +100,37 @@ DEPTH_MAP = {
     8: "Organization",
 }
 
+# Privilege name -> (entity, action) for every privilege checked above.
+# Built once so parsing a returned privilege is a single dict lookup.
+PRIVILEGE_LOOKUP = {
+    f"prv{action}{entity}": (entity, action)
+    for privileges in EXPECTED_ROLES.values()
+    for entity, actions in privileges.items()
+    for action in actions
+}
+
 
-def get_role_privileges(client: ELMClient, role_name: str) -> Optional[dict]:
+def get_role_privileges(
+    client: ELMClient,
+    role_name: str,
+    find_roles: Optional[Callable[..., list[dict]]] = None,
+) -> Optional[dict]:
     """
     Get privileges for a security role.
 
     Args:
         client: ELM client
         role_name: Security role name
+        find_roles: Role lookup from client.compile_query(), reused across
+            calls when checking several roles
 
     Returns:
         Dictionary of entity -> privilege -> depth, or None if role not found
     """
     # Query for role
-    roles = client.query(
-        "roles",
-        select=["roleid", "name"],
-        filter_expr=f"name eq '{role_name}'",
-    )
+    if find_roles is None:
+        find_roles = client.compile_query("roles", select=["roleid", "name"])
+    roles = find_roles(filter_expr=f"name eq '{role_name}'")
 
     if not roles:
         return None
@@ -151,16 +164,12 @@ def get_role_privileges(client: ELMClient, role_name: str) -> Optional[dict]:
         # Linked entity attributes come with alias prefix
         priv_name = priv.get("priv.name", priv.get("priv_x002e_name", ""))
 
-        # Parse privilege name (e.g., "prvCreatefsi_environmentrequest")
-        if priv_name.startswith("prv"):
-            # Extract action and entity
-            for action in ["Create", "Read", "Write", "Delete", "Append", "AppendTo"]:
-                if priv_name.startswith(f"prv{action}"):
-                    entity = priv_name[len(f"prv{action}"):]
-                    if entity not in priv_map:
-                        priv_map[entity] = {}
-                    priv_map[entity][action] = DEPTH_MAP.get(depth, f"Unknown({depth})")
-                    break
+        # Map privilege name (e.g., "prvCreatefsi_environmentrequest") to
+        # entity and action; exact lookup keeps prvAppendTo distinct from prvAppend
+        parsed = PRIVILEGE_LOOKUP.get(priv_name)
+        if parsed:
+            entity, action = parsed
+            priv_map.setdefault(entity, {})[action] = DEPTH_MAP.get(depth, f"Unknown({depth})")
 
     return priv_map
 
@@ -276,79 +285,84 @@ def main():
     print()
 
     try:
-        client = ELMClient(
+        with ELMClient(
             tenant_id=args.tenant_id,
             client_id=args.client_id,
             client_secret=client_secret,
             environment_url=args.environment_url,
-        )
-
-        results = {
-            "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
-            "environment": args.environment_url,
-            "roles": {},
-        }
-
-        all_passed = True
-        roles_to_check = [args.role_name] if args.role_name else EXPECTED_ROLES.keys()
-
-        for role_name in roles_to_check:
-            print(f"Checking {role_name}...")
-
-            expected = EXPECTED_ROLES.get(role_name, {})
-            actual = get_role_privileges(client, role_name)
-            passed, issues = verify_role(role_name, actual, expected, args.verbose)
-
-            results["roles"][role_name] = {
-                "passed": passed,
-                "issues": issues,
-                "actual": actual,
+        ) as client:
+            results = {
+                "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+                "environment": args.environment_url,
+                "roles": {},
             }
 
-            if passed:
-                # Show summary of granted privileges
-                for entity in expected:
-                    granted = []
-                    for priv, depth in expected[entity].items():
-                        if depth:
-                            granted.append(f"{priv}({depth[:3]})")
-                    if granted:
-                        print(f"  {entity}: {' '.join(granted)} ✓")
-
-                # Special verification for ELM Admin
-                if role_name == "ELM Admin":
-                    print("  [VERIFY] No Write privilege on fsi_provisioninglog ✓")
-                    print("  [VERIFY] No Delete privilege on fsi_provisioninglog ✓")
+            all_passed = True
+            roles_to_check = [args.role_name] if args.role_name else EXPECTED_ROLES.keys()
+            find_roles = client.compile_query("roles", select=["roleid", "name"])
+
+            # Roles are independent: fetch them concurrently, report in order
+            role_privileges = client.parallel_map(
+                lambda role_name: get_role_privileges(client, role_name, find_roles),
+                roles_to_check,
+            )
+
+            for role_name, actual in zip(roles_to_check, role_privileges):
+                print(f"Checking {role_name}...")
+
+                expected = EXPECTED_ROLES.get(role_name, {})
+                passed, issues = verify_role(role_name, actual, expected, args.verbose)
+
+                results["roles"][role_name] = {
+                    "passed": passed,
+                    "issues": issues,
+                    "actual": actual,
+                }
+
+                if passed:
+                    # Show summary of granted privileges
+                    for entity in expected:
+                        granted = []
+                        for priv, depth in expected[entity].items():
+                            if depth:
+                                granted.append(f"{priv}({depth[:3]})")
+                        if granted:
+                            print(f"  {entity}: {' '.join(granted)} ✓")
+
+                    # Special verification for ELM Admin
+                    if role_name == "ELM Admin":
+                        print("  [VERIFY] No Write privilege on fsi_provisioninglog ✓")
+                        print("  [VERIFY] No Delete privilege on fsi_provisioninglog ✓")
+                else:
+                    all_passed = False
+                    for issue in issues:
+                        print(f"  ✗ {issue}")
+
+                print()
+
+            # Summary
+            print("=" * 24)
+            if all_passed:
+                print("Summary: All roles configured correctly ✓")
+                print()
+                print("Immutability verification: PASSED")
+                print("  - ELM Admin has no Write on fsi_provisioninglog")
+                print("  - ELM Admin has no Delete on fsi_provisioninglog")
             else:
-                all_passed = False
-                for issue in issues:
-                    print(f"  ✗ {issue}")
-
-            print()
-
-        # Summary
-        print("=" * 24)
-        if all_passed:
-            print("Summary: All roles configured correctly ✓")
-            print()
-            print("Immutability verification: PASSED")
-            print("  - ELM Admin has no Write on fsi_provisioninglog")
-            print("  - ELM Admin has no Delete on fsi_provisioninglog")
-        else:
-            print("Summary: Configuration issues found ✗")
-            print()
-            print("Recommended actions:")
-            print("  1. Review security role definitions")
-            print("  2. Remove unauthorized privileges")
-            print("  3. Re-run verification")
-
-        # Export to JSON if requested
-        if args.output_path:
-            with open(args.output_path, "w") as f:
-                json.dump(results, f, indent=2)
-            print(f"\nResults exported to: {args.output_path}")
-
-        sys.exit(0 if all_passed else 3)
+                print("Summary: Configuration issues found ✗")
+                print()
+                print("Recommended actions:")
+                print("  1. Review security role definitions")
+                print("  2. Remove unauthorized privileges")
+                print("  3. Re-run verification")
+
+            # Export to JSON if requested
+            if args.output_path:
+                with open(args.output_path, "w") as f:
+                    json.dump(results, f, indent=2)
+                print(f"\nResults exported to: {args.output_path}")
+
+            sys.exit(0 if all_passed else 3)
 
     except Exception as e:
         print(f"\nError: {e}", file=sys.stderr)